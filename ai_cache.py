@@ -0,0 +1,111 @@
+"""
+Persistent cache of AI classification results.
+
+Crossposts and reposts carry the same job text, so results are keyed by a
+hash of the normalized post text plus the model name and prompt version.
+A duplicate post is answered from SQLite without an API call. Entries
+expire after a TTL and the least recently used ones are evicted past a
+size limit.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+
+from author_store import DB_FILE
+from metrics import CACHE_HITS, CACHE_MISSES
+
+DEFAULT_TTL = 14 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def normalize_post_text(text):
+    """Case-fold and collapse whitespace so trivial edits hash the same."""
+    return " ".join(text.casefold().split())
+
+
+def cache_key(full_post_text, model, prompt_version):
+    """Hash of the normalized post text, model name and prompt version."""
+    payload = "\x00".join([model or "", prompt_version, normalize_post_text(full_post_text)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    SQLite-backed TTL/LRU cache of classifier results.
+
+    Args:
+        path (str): SQLite database file (shared with the author store).
+        ttl (float): Seconds before an entry is considered stale.
+        max_entries (int): Least recently used entries are evicted beyond this.
+    """
+
+    def __init__(self, path=DB_FILE, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ai_cache (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_ai_cache_last_used ON ai_cache(last_used_at);
+        """)
+        self.conn.commit()
+
+    def get(self, full_post_text, model, prompt_version):
+        """Return the cached result dict, or None on a miss or expired entry."""
+        key = cache_key(full_post_text, model, prompt_version)
+        now = time.time()
+        row = self.conn.execute(
+            "SELECT result, created_at FROM ai_cache WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or now - row[1] > self.ttl:
+            if row is not None:
+                with self.conn:
+                    self.conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            self.misses += 1
+            CACHE_MISSES.inc()
+            return None
+
+        with self.conn:
+            self.conn.execute("UPDATE ai_cache SET last_used_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        CACHE_HITS.inc()
+        return json.loads(row[0])
+
+    def put(self, full_post_text, model, prompt_version, result):
+        """Store a result and evict least recently used entries past max_entries."""
+        key = cache_key(full_post_text, model, prompt_version)
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, result, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now),
+            )
+            self.conn.execute(
+                "DELETE FROM ai_cache WHERE key IN ("
+                "  SELECT key FROM ai_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?"
+                ")",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        """Return hit/miss counters and the current hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,153 @@
+"""
+SQLite-backed ledger of Reddit authors the bot has already handled.
+
+Replaces the old flat files (messaged_authors.txt / no_chat_authors.txt).
+The database runs in WAL mode with a unique index on username, so a
+membership check is a single index lookup instead of loading every line
+at startup. Writes are buffered and committed in batches, except for
+outcomes that follow an action outside the bot (a sent message, a saved
+lead): those are committed at once, so a killed process cannot forget
+them and contact the author again.
+"""
+import os
+import sqlite3
+import time
+
+DB_FILE = "bot_state.sqlite3"
+
+OUTCOME_MESSAGED = "messaged"
+OUTCOME_NO_CHAT = "no_chat"
+OUTCOME_LEAD = "lead"  # written to the leads file by the API-only bot
+
+# Outcomes recorded after a side effect; committed immediately instead of batched
+DURABLE_OUTCOMES = {OUTCOME_MESSAGED, OUTCOME_LEAD}
+
+# Legacy flat files, imported once into the database
+LEGACY_FILES = {
+    OUTCOME_MESSAGED: "messaged_authors.txt",
+    OUTCOME_NO_CHAT: "no_chat_authors.txt",
+}
+
+
+class AuthorStore:
+    """
+    Indexed store of handled authors with outcome, timestamp and post id.
+
+    Args:
+        path (str): SQLite database file.
+        batch_size (int): Number of pending writes that triggers a commit.
+        flush_interval (float): Max seconds a pending write may wait before commit.
+    """
+
+    def __init__(self, path=DB_FILE, batch_size=20, flush_interval=30.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._last_flush = time.monotonic()
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS authors (
+                username TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                post_id TEXT,
+                handled_at REAL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_authors_username ON authors(username);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        self.conn.commit()
+
+    def import_legacy_files(self, files=None):
+        """
+        Import the old text ledgers once. Later calls are no-ops.
+
+        Returns:
+            int: Number of usernames imported (0 if already done).
+        """
+        if self._get_meta("legacy_imported"):
+            return 0
+
+        files = files or LEGACY_FILES
+        imported = 0
+        with self.conn:
+            for outcome, filename in files.items():
+                if not os.path.exists(filename):
+                    continue
+                with open(filename, "r", encoding="utf-8") as f:
+                    rows = [(line.strip(), outcome) for line in f if line.strip()]
+                cursor = self.conn.executemany(
+                    "INSERT OR IGNORE INTO authors (username, outcome) VALUES (?, ?)",
+                    rows,
+                )
+                imported += cursor.rowcount
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                (str(time.time()),),
+            )
+        return imported
+
+    def __contains__(self, username):
+        if username in self._pending:
+            return True
+        row = self.conn.execute(
+            "SELECT 1 FROM authors WHERE username = ?", (username,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM authors").fetchone()[0]
+        return count + len(self._pending.keys() - self._committed(self._pending))
+
+    def record(self, username, outcome, post_id=None):
+        """Queue an author outcome; commits once the batch is full or stale, or at once for DURABLE_OUTCOMES."""
+        self._pending[username] = (username, outcome, post_id, time.time())
+        if (outcome in DURABLE_OUTCOMES
+                or len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def get(self, username):
+        """Return (outcome, post_id, handled_at) for an author, or None."""
+        if username in self._pending:
+            return self._pending[username][1:]
+        return self.conn.execute(
+            "SELECT outcome, post_id, handled_at FROM authors WHERE username = ?",
+            (username,),
+        ).fetchone()
+
+    def flush(self):
+        """Commit all pending writes in a single transaction."""
+        if self._pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO authors (username, outcome, post_id, handled_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    list(self._pending.values()),
+                )
+            self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def _committed(self, usernames):
+        if not usernames:
+            return set()
+        placeholders = ",".join("?" * len(usernames))
+        rows = self.conn.execute(
+            f"SELECT username FROM authors WHERE username IN ({placeholders})",
+            list(usernames),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
@@ -0,0 +1,73 @@
+"""
+Compare page-load time and Chrome memory with and without resource blocking.
+
+Launches a throwaway headless Chrome profile per mode (off / prefs / cdp),
+loads the job listing and a few author profiles from it, and reports the
+median load time and the RSS of the Chrome process tree afterwards.
+Needs Chrome and network access.
+
+Usage:
+    python -m benchmarks.bench_browser_blocking [--rounds N] [--profiles N] [--strategy eager]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from browser import chrome_rss_bytes, create_driver
+from listing_fetcher import LISTING_URL
+from listing_parser import parse_listing
+
+MODES = ["off", "prefs", "cdp"]
+
+
+def timed_load(driver, url, locator, timeout=30):
+    start = time.perf_counter()
+    driver.get(url)
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator))
+    return time.perf_counter() - start
+
+
+def bench_mode(mode, args):
+    with tempfile.TemporaryDirectory() as profile_dir:
+        driver = create_driver(profile_dir=profile_dir, block_resources=mode,
+                               page_load_strategy=args.strategy, headless=True)
+        try:
+            listing_times, profile_times = [], []
+            for _ in range(args.rounds):
+                listing_times.append(timed_load(driver, LISTING_URL, (By.ID, "siteTable")))
+                posts = parse_listing(driver.page_source)[:args.profiles]
+                for post in posts:
+                    profile_times.append(timed_load(driver, post["author_href"], (By.CSS_SELECTOR, ".side")))
+            rss = chrome_rss_bytes(driver)
+        finally:
+            driver.quit()
+
+    return {
+        "listing": statistics.median(listing_times),
+        "profile": statistics.median(profile_times) if profile_times else 0.0,
+        "rss_mb": rss / 1024 / 1024 if rss else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--profiles", type=int, default=3, help="Author profiles loaded per round")
+    parser.add_argument("--strategy", default="eager", choices=["normal", "eager", "none"])
+    parser.add_argument("--modes", nargs="*", default=MODES, choices=MODES)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'listing p50':>14}{'profile p50':>14}{'Chrome RSS':>14}")
+    for mode in args.modes:
+        result = bench_mode(mode, args)
+        print(f"{mode:<8}{result['listing'] * 1000:>11.0f} ms{result['profile'] * 1000:>11.0f} ms"
+              f"{result['rss_mb']:>11.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
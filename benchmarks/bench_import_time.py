@@ -0,0 +1,88 @@
+"""
+Measure how long it takes to import the bot's modules in a fresh interpreter.
+
+Each module is imported in a new `python -X importtime` process several
+times; the median cumulative import time is reported together with the
+heaviest modules it imports directly. OPENAI_API_KEY is removed from the
+child environment to check that importing needs no credentials.
+
+Usage:
+    python -m benchmarks.bench_import_time [module ...] [--runs N] [--budget-ms MS]
+
+Exits with status 1 if a module fails to import or exceeds --budget-ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["settings", "reddit_bot", "reddit_bot_api"]
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module):
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns:
+        tuple[int, dict[str, int]]: Cumulative microseconds for the module, and
+        for each module it imports directly.
+    """
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    # Lines are printed after each import finishes, children before their parent;
+    # the name column is indented two spaces per nesting level
+    total, direct = None, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            direct[name.strip()] = int(cumulative_us)
+        elif depth == 0:
+            if name.strip() == module:
+                total = int(cumulative_us)
+                break
+            direct = {}  # interpreter start-up imports, not ours
+    return total, direct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="Heaviest direct imports shown per module")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        try:
+            profiles = [import_profile(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(e)
+            failed = True
+            continue
+
+        total_ms = statistics.median(total for total, _ in profiles) / 1000
+        over = args.budget_ms is not None and total_ms > args.budget_ms
+        failed |= over
+        print(f"{module}: {total_ms:.0f} ms (median of {args.runs}){'  OVER BUDGET' if over else ''}")
+
+        heaviest = sorted(((us, name) for name, us in profiles[-1][1].items()), reverse=True)
+        for us, name in heaviest[:args.top]:
+            print(f"    {name:<36}{us / 1000:>8.0f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
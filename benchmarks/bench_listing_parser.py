@@ -0,0 +1,59 @@
+"""
+Benchmark the listing parsers against saved old.reddit pages.
+
+.html fixtures go through parse_listing, .json fixtures (saved from the
+`.json` listing endpoint) through parse_listing_json.
+
+Usage:
+    python -m benchmarks.bench_listing_parser [fixture.html|fixture.json ...] [--iterations N]
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import time
+
+from listing_parser import parse_listing, parse_listing_json
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def bench_file(path, iterations):
+    with open(path, "r", encoding="utf-8") as f:
+        page_source = f.read()
+
+    if path.endswith(".json"):
+        def parse(source):
+            return parse_listing_json(json.loads(source))
+    else:
+        parse = parse_listing
+
+    timings = []
+    posts = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        posts = parse(page_source)
+        timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+    print(f"{os.path.basename(path)}: {len(posts)} posts, {len(page_source) / 1024:.1f} KiB")
+    print(f"  median {statistics.median(timings) * 1000:.2f} ms/page, "
+          f"p95 {p95 * 1000:.2f} ms/page, "
+          f"{len(posts) / statistics.median(timings):.0f} posts/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixtures", nargs="*",
+                        default=sorted(glob.glob(os.path.join(FIXTURES_DIR, "old_reddit_*"))))
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    for path in args.fixtures:
+        bench_file(path, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
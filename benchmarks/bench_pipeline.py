@@ -0,0 +1,118 @@
+"""
+Offline benchmark of the listing-parse -> dedup -> classify pipeline.
+
+Runs the shared pipeline (listing_parser, pipeline, classifier) against
+saved old.reddit pages and a local fake OpenAI server (benchmarks/fake_openai_server.py), so no network
+access or API key is needed. Every cycle starts from an empty author store
+and seen-post index, so each one processes the full page.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--cycles N] [--latency S] [--error-rate R]
+                                        [--batch-size N] [--concurrency N]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_cycle(page_source, workdir, args, prefilter):
+    """One cold poll cycle; returns (posts parsed, posts classified)."""
+    import classifier
+    import pipeline
+    from author_store import AuthorStore
+    from listing_parser import parse_listing
+    from seen_posts import SeenPostIndex
+
+    author_store = AuthorStore(os.path.join(workdir, "state.sqlite3"))
+    seen_posts = SeenPostIndex(os.path.join(workdir, "seen.json"))
+    try:
+        posts = parse_listing(page_source, skip=seen_posts.__contains__)
+        candidates = pipeline.select_candidates(posts, author_store, seen_posts, prefilter)
+        analyses = classifier.classify_posts(candidates, batch_size=args.batch_size,
+                                             concurrency=args.concurrency) if candidates else []
+        for post, analysis in zip(candidates, analyses):
+            author_store.record(post["author"], "bench", post["post_id"])
+            seen_posts.add(post["post_id"])
+        author_store.flush()
+        seen_posts.save()
+        return len(posts), len(candidates)
+    finally:
+        author_store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixtures", nargs="*",
+                        default=sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))))
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--no-prefilter", action="store_true")
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.fixtures:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+
+    with FakeOpenAIServer(args.latency, args.jitter, args.error_rate) as server:
+        # Settings are read on first use, after the fake server is in the environment
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "fake-key"
+        os.environ.setdefault("OPENAI_MODEL", "fake-model")
+        os.environ.setdefault("TRAFFIC_LOG", "")  # keep fake traffic out of the recorded log
+        import classifier
+        from prefilter import Prefilter
+
+        prefilter = Prefilter([] if args.no_prefilter else None)
+        cycle_times = []
+        parsed_total = classified_total = 0
+        tokens_before = {stage: dict(usage) for stage, usage in classifier.token_usage.items()}
+
+        for cycle in range(args.cycles):
+            page_source = pages[cycle % len(pages)]
+            with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                parsed, classified = run_cycle(page_source, workdir, args, prefilter)
+                cycle_times.append(time.perf_counter() - start)
+            parsed_total += parsed
+            classified_total += classified
+
+        total_time = sum(cycle_times)
+        tokens = sum(
+            usage["prompt_tokens"] + usage["completion_tokens"]
+            - tokens_before[stage]["prompt_tokens"] - tokens_before[stage]["completion_tokens"]
+            for stage, usage in classifier.token_usage.items()
+        )
+
+    print(f"Cycles: {args.cycles} | batch size {args.batch_size} | concurrency {args.concurrency} | "
+          f"latency {args.latency}s +/- {args.jitter}s | error rate {args.error_rate:.0%}")
+    print(f"Posts parsed: {parsed_total}, sent to classifier: {classified_total}")
+    print(f"API requests: {server.requests} ({server.errors} simulated errors)")
+    print(f"Throughput: {parsed_total / total_time:.1f} posts/sec")
+    print(f"Cycle time: p50 {statistics.median(cycle_times) * 1000:.0f} ms, "
+          f"p95 {percentile(cycle_times, 95) * 1000:.0f} ms")
+    print(f"Tokens per post: {tokens / parsed_total:.0f} "
+          f"({tokens / classified_total if classified_total else 0:.0f} per classified post)")
+
+
+if __name__ == "__main__":
+    main()
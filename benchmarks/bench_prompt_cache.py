@@ -0,0 +1,219 @@
+"""
+Compare the old and the cache-friendly prompt layouts: time to first token and billed tokens.
+
+"before" is the v2 layout, where the post text sits in the middle of the
+user prompt, ahead of the rules and examples. "after" is the current
+classifier.py layout: all static instructions in the system message and
+the post content last, sent with a prompt_cache_key. Each layout sends
+the labelled fixture posts as single-post classifications, batched
+classifications and message requests, streamed. For each request it
+measures the time to the first content chunk and reads the prompt and
+cached-token counts from the usage report.
+
+By default this runs against the local fake server. The server simulates
+a provider prefix cache (1024-token minimum, 128-token blocks) and a
+prompt processing time for uncached tokens, so the numbers come from that
+model rather than from measurement. With --live the requests go to the
+configured OpenAI API with the configured models, and cost real tokens.
+Providers only cache prompts whose shared prefix reaches their minimum.
+The report shows each layout's static prefix size next to that minimum.
+
+Usage:
+    python -m benchmarks.bench_prompt_cache [--posts N] [--cached-discount 0.5]
+                                            [--cache-min-tokens 1024] [--prefill-per-1k 0.05]
+    python -m benchmarks.bench_prompt_cache --live --posts 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import time
+
+from benchmarks.fake_openai_server import FakeOpenAIServer, PrefixCache, estimate_tokens
+
+LABELLED_POSTS = os.path.join(os.path.dirname(__file__), "fixtures", "labelled_posts.jsonl")
+
+
+def legacy_post_messages(classifier, full_post_text):
+    """Single-post classification as sent before the prompt layout change (v2)."""
+    prompt = f"""
+        Is this post someone HIRING a SOFTWARE DEVELOPER/PROGRAMMER for coding work?
+
+        Post: "{full_post_text}"
+{classifier.CLASSIFICATION_RULES}
+        {{
+            "is_hiring_post": true/false
+        }}
+        """
+    return [
+        {"role": "system", "content": classifier.CLASSIFIER_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def legacy_batch_messages(classifier, batch):
+    posts_json = json.dumps([{"id": post["post_id"], "text": classifier.post_text(post)} for post in batch],
+                            ensure_ascii=False)
+    prompt = f"""
+        For EACH post below, decide whether it is someone HIRING a SOFTWARE DEVELOPER/PROGRAMMER for coding work.
+{classifier.CLASSIFICATION_RULES}
+        Posts (JSON array of objects with "id" and "text"):
+        {posts_json}
+
+        Respond with one JSON object containing exactly one result per post id:
+        {{
+            "results": [
+                {{"id": "post id", "is_hiring_post": true/false}}
+            ]
+        }}
+        """
+    return [
+        {"role": "system", "content": classifier.CLASSIFIER_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def legacy_message_messages(classifier, full_post_text):
+    prompt = f"""
+        Write a chat message to the author of this post, who is HIRING a software developer.
+
+        Post: "{full_post_text}"
+{classifier.MESSAGE_RULES}
+        Reply with the message text only.
+        """
+    return [
+        {"role": "system", "content": classifier.SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def build_requests(classifier, settings, layout, posts, batch_size):
+    """[(kind, create() kwargs)] for one layout."""
+    legacy = layout == "before"
+    requests = []
+    for post in posts:
+        text = classifier.post_text(post)
+        messages = legacy_post_messages(classifier, text) if legacy else classifier.build_post_messages(text)
+        requests.append(("single", {
+            "model": settings.classifier_model, "messages": messages,
+            "response_format": classifier.CLASSIFICATION_FORMAT,
+            "temperature": settings.classifier_temperature,
+            "max_completion_tokens": settings.classifier_max_tokens,
+        }))
+    for i in range(0, len(posts), batch_size):
+        batch = posts[i:i + batch_size]
+        messages = legacy_batch_messages(classifier, batch) if legacy else classifier.build_batch_messages(batch)
+        requests.append(("batch", {
+            "model": settings.classifier_model, "messages": messages,
+            "response_format": classifier.BATCH_CLASSIFICATION_FORMAT,
+            "temperature": settings.classifier_temperature,
+            "max_completion_tokens": settings.classifier_max_tokens * len(batch),
+        }))
+    for post in posts:
+        if not post["is_hiring_post"]:
+            continue
+        text = classifier.post_text(post)
+        messages = legacy_message_messages(classifier, text) if legacy else classifier.build_message_messages(text)
+        requests.append(("message", {
+            "model": settings.message_model, "messages": messages,
+            "temperature": settings.message_temperature,
+            "max_completion_tokens": settings.message_max_tokens,
+        }))
+    if not legacy:
+        cache_keys = {"single": "classify", "batch": "batch", "message": "message"}
+        for kind, kwargs in requests:
+            kwargs["extra_body"] = {"prompt_cache_key": classifier.PROMPT_CACHE_KEYS[cache_keys[kind]]}
+    return requests
+
+
+def timed_request(client, kwargs):
+    """Stream one completion; returns (seconds to first content, usage)."""
+    start = time.perf_counter()
+    first_token = usage = None
+    stream = client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs)
+    for chunk in stream:
+        if first_token is None and chunk.choices and chunk.choices[0].delta.content:
+            first_token = time.perf_counter() - start
+        if chunk.usage is not None:
+            usage = chunk.usage
+    return first_token if first_token is not None else time.perf_counter() - start, usage
+
+
+def static_prefix_tokens(requests):
+    """Estimated tokens shared by every request of a kind (the cacheable prefix)."""
+    texts = ["".join(m["content"] for m in kwargs["messages"]) for _, kwargs in requests]
+    prefix = os.path.commonprefix(texts) if len(texts) > 1 else ""
+    return estimate_tokens(prefix) if prefix else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--posts", type=int, default=None, help="Labelled posts to use (default: all)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--live", action="store_true", help="Use the configured OpenAI API (costs tokens)")
+    parser.add_argument("--cached-discount", type=float, default=0.5,
+                        help="Price reduction on cached prompt tokens (gpt-4o-mini: 0.5)")
+    parser.add_argument("--cache-min-tokens", type=int, default=1024)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake server base latency")
+    parser.add_argument("--prefill-per-1k", type=float, default=0.05,
+                        help="Fake server seconds per 1000 uncached prompt tokens")
+    args = parser.parse_args()
+
+    with open(LABELLED_POSTS, "r", encoding="utf-8") as f:
+        posts = [json.loads(line) for line in f if line.strip()][:args.posts]
+    for index, post in enumerate(posts):
+        post["post_id"] = f"t3_bench{index}"
+
+    results = {}  # (layout, kind) -> [(ttft, prompt, cached, completion)]
+    prefixes = {}
+    for layout in ("before", "after"):
+        server = None if args.live else FakeOpenAIServer(
+            args.latency, 0.0, 0.0, prompt_cache=PrefixCache(args.cache_min_tokens),
+            prefill_per_1k=args.prefill_per_1k)
+        with server or contextlib.nullcontext():
+            if server is not None:
+                # Settings are read on first use, after the server is in the environment
+                os.environ["OPENAI_BASE_URL"] = server.base_url
+                os.environ["OPENAI_API_KEY"] = "fake-key"
+                os.environ.setdefault("OPENAI_MODEL", "fake-model")
+            os.environ.setdefault("TRAFFIC_LOG", "")
+            import classifier
+            from settings import get_settings, openai_client
+
+            openai_client.cache_clear()  # a client for this layout's server
+            client = openai_client()
+            requests = build_requests(classifier, get_settings(), layout, posts, args.batch_size)
+            for kind in ("single", "batch", "message"):
+                prefixes[layout, kind] = static_prefix_tokens([r for r in requests if r[0] == kind])
+            for kind, kwargs in requests:
+                ttft, usage = timed_request(client, kwargs)
+                cached = classifier.cached_tokens(usage)
+                results.setdefault((layout, kind), []).append(
+                    (ttft, usage.prompt_tokens, cached, usage.completion_tokens))
+
+    source = "live API" if args.live else (f"fake server, simulated cache >= {args.cache_min_tokens} tokens, "
+                                           f"{args.prefill_per_1k * 1000:.0f} ms per 1k uncached tokens")
+    print(f"{len(posts)} posts, batch size {args.batch_size}, {source}, "
+          f"cached tokens billed at {1 - args.cached_discount:.0%}")
+    print(f"{'':<18}{'reqs':>6}{'prefix':>8}{'TTFT p50':>10}{'TTFT p95':>10}"
+          f"{'prompt':>9}{'cached':>9}{'billed in':>11}{'completion':>12}")
+    for kind in ("single", "batch", "message"):
+        for layout in ("before", "after"):
+            rows = results.get((layout, kind))
+            if not rows:
+                continue
+            ttfts = sorted(row[0] for row in rows)
+            prompt = sum(row[1] for row in rows)
+            cached = sum(row[2] for row in rows)
+            billed = prompt - cached * args.cached_discount
+            p95 = ttfts[min(len(ttfts) - 1, round(0.95 * len(ttfts)) - 1)]
+            print(f"{kind + ' ' + layout:<18}{len(rows):>6}{prefixes[layout, kind]:>8}"
+                  f"{statistics.median(ttfts) * 1000:>8.0f}ms{p95 * 1000:>8.0f}ms"
+                  f"{prompt:>9}{cached:>9}{billed:>11.0f}{sum(row[3] for row in rows):>12}")
+    print(f"prefix = estimated tokens every request of that kind starts with; "
+          f"prompt caching needs >= {args.cache_min_tokens}")
+
+
+if __name__ == "__main__":
+    main()
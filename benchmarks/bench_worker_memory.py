@@ -0,0 +1,149 @@
+"""
+Steady-state memory of the worker over a simulated 24-hour run.
+
+Drives the worker's pipeline (JSON listing parse, dedup, prefilter,
+batched classification, lead sink) for a day's worth of poll cycles
+without sleeping between them, against a local fake OpenAI server. Each
+cycle returns new posts made from the saved listing with fresh ids and
+authors (plus some repeat authors and reposted text, which hit the author
+store and the classification cache), so the bot's stores and indexes grow
+the way they would in production. The RSS of this process is sampled
+every simulated hour, through the same MemoryBudget check the worker runs.
+
+Usage:
+    python -m benchmarks.bench_worker_memory [--hours 24] [--poll-seconds 60]
+                                             [--posts-per-cycle 3] [--budget-mb 512]
+
+Exits with status 1 if peak RSS exceeds --budget-mb.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "old_reddit_job_new.json")
+
+
+class SyntheticListing:
+    """A `read_listing(skip)` that returns new posts built from a saved listing on every call."""
+
+    def __init__(self, template, posts_per_cycle, repeat_author_rate=0.1, repost_rate=0.1, seed=0):
+        self.children = template["data"]["children"]
+        self.posts_per_cycle = posts_per_cycle
+        self.repeat_author_rate = repeat_author_rate
+        self.repost_rate = repost_rate
+        self.random = random.Random(seed)
+        self.count = 0
+
+    def listing(self):
+        children = []
+        for _ in range(self.posts_per_cycle):
+            self.count += 1
+            child = copy.deepcopy(self.random.choice(self.children))
+            post = child["data"]
+            post["name"] = f"t3_sim{self.count:07d}"
+            if self.count == 1 or self.random.random() >= self.repeat_author_rate:
+                post["author"] = f"sim_author_{self.count}"
+            else:
+                post["author"] = f"sim_author_{self.random.randint(1, self.count - 1)}"
+            if self.random.random() >= self.repost_rate:
+                post["selftext"] += f"\n\nRef #{self.count}"  # distinct text, so a cache miss
+            children.append(child)
+        return {"kind": "Listing", "data": {"children": children}}
+
+    def __call__(self, skip):
+        from listing_parser import parse_listing_json
+        import metrics
+
+        data = json.loads(json.dumps(self.listing()))  # as if decoded from a response
+        with metrics.LISTING_PARSE_SECONDS.time(format="json"):
+            return parse_listing_json(data, skip=skip)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--poll-seconds", type=float, default=60.0,
+                        help="Simulated time between polls")
+    parser.add_argument("--posts-per-cycle", type=int, default=3)
+    parser.add_argument("--budget-mb", type=float, default=512.0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake API latency per request")
+    args = parser.parse_args()
+
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        template = json.load(f)
+
+    cycles = int(args.hours * 3600 / args.poll_seconds)
+    cycles_per_hour = max(1, int(3600 / args.poll_seconds))
+
+    with FakeOpenAIServer(args.latency, 0.0, 0.0) as server, tempfile.TemporaryDirectory() as workdir:
+        # Settings are read on first use, after the fake server is in the environment
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "fake-key"
+        os.environ.setdefault("OPENAI_MODEL", "fake-model")
+        os.environ.setdefault("TRAFFIC_LOG", "")  # keep fake traffic out of the recorded log
+        import pipeline
+        from ai_cache import ClassificationCache
+        from author_store import AuthorStore
+        from bot_logging import setup_logging, stop_logging
+        from memory_budget import MemoryBudget
+        from prefilter import Prefilter
+        from seen_posts import SeenPostIndex
+        from sinks import LeadFileSink
+
+        # Same handlers as a worker with LOG_FILE set, minus the console
+        setup_logging(path=os.path.join(workdir, "bot.log"), console=False)
+        state_db = os.path.join(workdir, "bot_state.sqlite3")
+        author_store = AuthorStore(state_db)
+        seen_posts = SeenPostIndex(os.path.join(workdir, "seen_posts.json"))
+        ai_cache = ClassificationCache(state_db)
+        prefilter = Prefilter()
+        sink = LeadFileSink(os.path.join(workdir, "leads.jsonl"))
+        budget = MemoryBudget(args.budget_mb)
+        read_listing = SyntheticListing(template, args.posts_per_cycle)
+
+        samples = []  # (simulated hour, RSS MB)
+        start = time.perf_counter()
+        try:
+            for cycle in range(1, cycles + 1):
+                budget.check()
+                posts = pipeline.fetch_new_posts(read_listing, seen_posts, "json")
+                pipeline.process_posts(posts, sink, author_store, seen_posts, ai_cache, prefilter)
+                if cycle % cycles_per_hour == 0 or cycle == cycles:
+                    hour = cycle * args.poll_seconds / 3600
+                    samples.append((hour, budget.rss_mb()))
+                    print(f"  hour {hour:5.1f}: {samples[-1][1]:6.1f} MB RSS, "
+                          f"{read_listing.count} posts, {sink.leads} leads")
+        finally:
+            sink.close()
+            author_store.close()
+            ai_cache.close()
+            stop_logging()
+        elapsed = time.perf_counter() - start
+
+    # Growth over the second half of the run, least-squares MB per hour
+    tail = samples[len(samples) // 2:]
+    slope = 0.0
+    if len(tail) > 1:
+        mean_h = sum(h for h, _ in tail) / len(tail)
+        mean_mb = sum(mb for _, mb in tail) / len(tail)
+        denom = sum((h - mean_h) ** 2 for h, _ in tail)
+        slope = sum((h - mean_h) * (mb - mean_mb) for h, mb in tail) / denom if denom else 0.0
+
+    over = budget.peak_rss_mb > args.budget_mb
+    print(f"Simulated {args.hours:.0f}h: {cycles} cycles every {args.poll_seconds:.0f}s, "
+          f"{read_listing.count} posts, {server.requests} API requests, in {elapsed:.0f}s")
+    print(f"RSS: first hour {samples[0][1]:.1f} MB, end {samples[-1][1]:.1f} MB, "
+          f"peak {budget.peak_rss_mb:.1f} MB of a {args.budget_mb:.0f} MB budget"
+          f"{'  OVER BUDGET' if over else ''}")
+    print(f"Steady-state growth (second half): {slope:+.2f} MB/hour, {budget.releases} memory release(s)")
+    raise SystemExit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Report prefilter precision/recall against a labelled set of posts.
+
+Each line of the labelled file is a JSON object with "title", "selftext"
+and "is_hiring_post".
+
+Usage:
+    python -m benchmarks.eval_prefilter [labelled.jsonl] [--reject-margin X]
+"""
+import argparse
+import json
+import os
+
+from prefilter import KeywordScorer, Prefilter, TitleTagRule, evaluate
+
+DEFAULT_LABELLED = os.path.join(os.path.dirname(__file__), "fixtures", "labelled_posts.jsonl")
+
+
+def load_labelled(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("labelled", nargs="?", default=DEFAULT_LABELLED)
+    parser.add_argument("--reject-margin", type=float, default=1.5)
+    args = parser.parse_args()
+
+    posts = load_labelled(args.labelled)
+    prefilter = Prefilter([TitleTagRule(), KeywordScorer(reject_margin=args.reject_margin)])
+    report = evaluate(prefilter, posts)
+
+    print(f"Labelled posts: {report['total']}")
+    print(f"Reject precision: {report['precision']:.2%}")
+    print(f"Reject recall:    {report['recall']:.2%}")
+    print(f"Model calls saved: {report['calls_saved']}/{report['total']}")
+    print(f"Leads lost: {report['leads_lost']}")
+    for title, reason in report["lost_posts"]:
+        print(f"  - {title!r} ({reason})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Answers POST /v1/chat/completions with replies shaped like the real API,
+after a configurable latency and with a configurable error rate, so the
+pipeline can be benchmarked without network access or API spend.
+Classification replies are decided with the local keyword scorer.
+Optionally it simulates a provider prompt cache (PrefixCache) and prompt
+processing time, and streams replies when asked to (`stream: true`).
+
+Usage (standalone):
+    python -m benchmarks.fake_openai_server --port 8089 --latency 0.8 --error-rate 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=fake python reddit_bot.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from prefilter import KeywordScorer
+
+_scorer = KeywordScorer()
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _is_hiring(text):
+    return _scorer.score(text, "") > 0
+
+
+def _posts_in_prompt(content):
+    """Find the JSON array of {"id", "text"} posts embedded in a batch prompt."""
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith('[{"id":'):
+            return json.loads(line)
+    return []
+
+
+class PrefixCache:
+    """
+    Simulated provider prompt cache.
+
+    A request reuses the longest prefix it shares with an earlier prompt for
+    the same model, counted in blocks of block_tokens, once that prefix is
+    at least min_tokens long (OpenAI: 1024 tokens in 128-token steps).
+    """
+
+    def __init__(self, min_tokens=1024, block_tokens=128):
+        self.min_tokens = min_tokens
+        self.block_tokens = block_tokens
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, body):
+        """Cached tokens for this request's prompt; its prefixes are then cached too."""
+        text = (body.get("model") or "") + "\x00" + "".join(
+            f"{m.get('role')}\x00{m.get('content') or ''}\x00" for m in body.get("messages", []))
+        block_chars = self.block_tokens * 4
+        prefixes = [hash(text[:i * block_chars]) for i in range(1, len(text) // block_chars + 1)]
+        with self._lock:
+            blocks = 0
+            for prefix in prefixes:
+                if prefix not in self._seen:
+                    break
+                blocks += 1
+            self._seen.update(prefixes)
+        cached = blocks * self.block_tokens
+        return cached if cached >= self.min_tokens else 0
+
+
+def build_reply(body):
+    """Reply content for a chat completion request body."""
+    messages = body.get("messages", [])
+    user_content = "\n".join(m.get("content") or "" for m in messages if m.get("role") == "user")
+    response_format = body.get("response_format") or {}
+    schema_name = response_format.get("json_schema", {}).get("name", "")
+
+    if schema_name.startswith("batch"):
+        results = [{"id": post["id"], "is_hiring_post": _is_hiring(post["text"])}
+                   for post in _posts_in_prompt(user_content)]
+        return json.dumps({"results": results})
+    if response_format:
+        return json.dumps({"is_hiring_post": _is_hiring(user_content)})
+    return "Sounds like a fun build - I've shipped a few of these. Peek at nofeelance.com and let's chat?"
+
+
+class FakeOpenAIServer:
+    """
+    Threaded fake API server.
+
+    Args:
+        latency (float): Mean seconds before each reply.
+        jitter (float): Latency is drawn uniformly from latency +/- jitter.
+        error_rate (float): Share of requests answered with a 429 or 500.
+        port (int): 0 picks a free port.
+        responder (callable, optional): `responder(body)` -> (content, usage, latency) to answer
+            a request instead of the keyword scorer; any item may be None for the default.
+        prompt_cache (PrefixCache, optional): Report cached prompt tokens from a simulated cache.
+        prefill_per_1k (float): Extra seconds per 1000 uncached prompt tokens.
+    """
+
+    def __init__(self, latency=0.5, jitter=0.2, error_rate=0.0, port=0, host="127.0.0.1", responder=None,
+                 prompt_cache=None, prefill_per_1k=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.responder = responder
+        self.prompt_cache = prompt_cache
+        self.prefill_per_1k = prefill_per_1k
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+
+                content, usage, latency = server.responder(body) if server.responder else (None, None, None)
+                if content is None:
+                    content = build_reply(body)
+                if usage is None:
+                    prompt_text = "".join(m.get("content") or "" for m in body.get("messages", []))
+                    usage = {"prompt_tokens": estimate_tokens(prompt_text),
+                             "completion_tokens": estimate_tokens(content)}
+                prompt_tokens, completion_tokens = usage["prompt_tokens"], usage["completion_tokens"]
+                if server.prompt_cache is not None:
+                    cached_tokens = min(prompt_tokens, server.prompt_cache.lookup(body))
+                else:
+                    cached_tokens = usage.get("cached_tokens", 0)
+                if latency is None:
+                    latency = random.uniform(server.latency - server.jitter, server.latency + server.jitter)
+                    latency += server.prefill_per_1k * (prompt_tokens - cached_tokens) / 1000
+                time.sleep(max(0.0, latency))
+
+                if random.random() < server.error_rate:
+                    with server._lock:
+                        server.errors += 1
+                    status = random.choice([429, 500])
+                    self._send_json(status, {"error": {"message": "simulated error", "type": "fake_error"}},
+                                    {"retry-after": "0.1"} if status == 429 else None)
+                    return
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+                    return
+
+                completion = {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model") or "fake-model",
+                }
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                }
+                if body.get("stream"):
+                    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+                    self._send_stream(completion, content, usage if include_usage else None)
+                    return
+                self._send_json(200, {
+                    **completion,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content, "refusal": None},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": usage,
+                })
+
+            def _send_stream(self, completion, content, usage):
+                """Server-sent events: the content chunk, the finish chunk, then usage if requested."""
+                chunk = {**completion, "object": "chat.completion.chunk"}
+                events = [
+                    {**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": content},
+                                           "finish_reason": None}]},
+                    {**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]},
+                ]
+                if usage is not None:
+                    events.append({**chunk, "choices": [], "usage": usage})
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                for event in events:
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--prompt-cache", action="store_true", help="Simulate prefix prompt caching")
+    parser.add_argument("--prefill-per-1k", type=float, default=0.0,
+                        help="Extra seconds per 1000 uncached prompt tokens")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.latency, args.jitter, args.error_rate, port=args.port,
+                              prompt_cache=PrefixCache() if args.prompt_cache else None,
+                              prefill_per_1k=args.prefill_per_1k)
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
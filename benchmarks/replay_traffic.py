@@ -0,0 +1,304 @@
+"""
+Replay recorded classifier traffic offline to compare prompts and models.
+
+Reads the traffic log written by traffic_log.py and runs the recorded
+posts through the current classifier.py code: current prompts, models,
+batch size and concurrency. The requests go to a local stand-in server
+(benchmarks/fake_openai_server.py) that answers from the recording:
+
+- A request identical to a recorded one (same model and messages) gets
+  the recorded reply, token usage and latency.
+- A changed request (new prompt or model) gets the recorded label for
+  each post, estimated token counts (about 4 characters per token) and
+  the median recorded latency for that kind of request.
+
+Each post and each message is replayed once, so the recorded side of the
+report is the matching set: the first successful recorded request for
+each post or message. Repeats of a post across refreshes, retries and
+failed attempts are left out of it (and counted in the header).
+
+The report puts the recorded and replayed traffic side by side: requests,
+tokens, cost, per-request latency and agreement with the recorded
+labels. Changed requests only have estimated token counts, so compare
+prompt sizes with --estimate-recorded.
+
+Usage:
+    python -m benchmarks.replay_traffic [LOG] [--speed 1.0] [--batch-size N] [--concurrency N]
+                                        [--gap S] [--limit N] [--record PATH]
+    CLASSIFIER_MODEL=gpt-4.1-nano python -m benchmarks.replay_traffic
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import traffic_log
+from benchmarks.fake_openai_server import FakeOpenAIServer, _is_hiring, _posts_in_prompt, estimate_tokens
+
+
+def post_labels(entries):
+    """{post text: is_hiring_post} from the classify entries' parsed results."""
+    labels = {}
+    for entry in entries:
+        result = entry.get("result")
+        if entry["stage"] != "classify" or not isinstance(result, dict):
+            continue
+        if "results" in result:
+            text_by_id = {post["id"]: post["text"] for post in entry["posts"]}
+            for item in result["results"]:
+                if item.get("id") in text_by_id and isinstance(item.get("is_hiring_post"), bool):
+                    labels[text_by_id[item["id"]]] = item["is_hiring_post"]
+        elif isinstance(result.get("is_hiring_post"), bool) and entry["posts"]:
+            labels[entry["posts"][0]["text"]] = result["is_hiring_post"]
+    return labels
+
+
+def request_kind(entry_or_body):
+    """"batch", "single" or "message"."""
+    if "stage" in entry_or_body:
+        if entry_or_body["stage"] == "message":
+            return "message"
+        return "batch" if len(entry_or_body["posts"]) > 1 else "single"
+    schema = (entry_or_body.get("response_format") or {}).get("json_schema", {}).get("name", "")
+    if not schema:
+        return "message"
+    return "batch" if schema.startswith("batch") else "single"
+
+
+class ReplayResponder:
+    """Answers stand-in server requests from recorded traffic (see the module docstring)."""
+
+    def __init__(self, entries, speed=1.0):
+        self.speed = speed
+        self.hits = self.misses = 0
+        self.by_hash = {entry["input_hash"]: entry for entry in entries if entry.get("response") is not None}
+        self.labels = post_labels(entries)
+        self.messages = {entry["posts"][0]["text"]: entry["result"] for entry in entries
+                         if entry["stage"] == "message" and entry.get("result")}
+        latencies = {}
+        for entry in entries:
+            if entry.get("latency_ms") is not None and entry.get("error") is None:
+                latencies.setdefault(request_kind(entry), []).append(entry["latency_ms"] / 1000)
+        self.median_latency = {kind: statistics.median(values) for kind, values in latencies.items()}
+
+    def __call__(self, body):
+        entry = self.by_hash.get(traffic_log.request_hash(body.get("model"), body.get("messages")))
+        if entry is not None:
+            self.hits += 1
+            latency = entry["latency_ms"] / 1000 if entry.get("latency_ms") is not None else None
+            return entry["response"], entry.get("usage"), self._scaled(latency)
+
+        self.misses += 1
+        kind = request_kind(body)
+        user_content = "\n".join(m.get("content") or "" for m in body.get("messages", []) if m.get("role") == "user")
+        if kind == "batch":
+            results = [{"id": post["id"], "is_hiring_post": self._label(post["text"])}
+                       for post in _posts_in_prompt(user_content)]
+            content = json.dumps({"results": results})
+        elif kind == "single":
+            text = self._find_text(user_content, self.labels)
+            is_hiring = self.labels[text] if text is not None else _is_hiring(user_content)
+            content = json.dumps({"is_hiring_post": is_hiring})
+        else:
+            text = self._find_text(user_content, self.messages)
+            content = self.messages[text] if text is not None else None
+        return content, None, self._scaled(self.median_latency.get(kind))
+
+    def _label(self, text):
+        return self.labels[text] if text in self.labels else _is_hiring(text)
+
+    @staticmethod
+    def _find_text(content, known):
+        # The longest recorded post text embedded in the prompt
+        return max((text for text in known if text in content), key=len, default=None)
+
+    def _scaled(self, latency):
+        return latency * self.speed if latency is not None else None
+
+
+class ListRecorder:
+    """Stands in for traffic_log.recorder to collect the replayed traffic (and optionally log it)."""
+
+    def __init__(self, forward=None):
+        self.entries = []
+        self.forward = forward
+
+    def record(self, entry):
+        self.entries.append(entry)
+        if self.forward is not None:
+            self.forward.record(entry)
+
+    def close(self):
+        if self.forward is not None:
+            self.forward.close()
+
+
+def replayed_requests(entries):
+    """The recorded requests the replay re-issues: the first successful one per post text and message."""
+    kept, classified, messaged = [], set(), set()
+    for entry in entries:
+        if entry.get("error") is not None or entry.get("response") is None:
+            continue
+        texts = [post["text"] for post in entry["posts"]]
+        done = messaged if entry["stage"] == "message" else classified
+        if all(text in done for text in texts):
+            continue
+        done.update(texts)
+        kept.append(entry)
+    return kept
+
+
+def refreshes(entries, gap):
+    """
+    Recorded classify posts, deduplicated and grouped into refreshes in listing order.
+
+    Batches of a refresh are logged in the order they finish, so each post is
+    put back at its recorded listing index within its recorded refresh. Logs
+    from before refresh ids were recorded are split at time gaps instead.
+    """
+    groups, keys, seen, last_time = [], {}, set(), None
+    for entry in entries:
+        if entry["stage"] != "classify":
+            continue
+        if entry.get("refresh") is not None:
+            key = entry["refresh"]
+        elif last_time is None or entry["time"] - last_time > gap:
+            key = object()
+        last_time = entry["time"]
+        if key not in keys:
+            keys[key] = len(groups)
+            groups.append([])
+        group = groups[keys[key]]
+        for post in entry["posts"]:
+            if post["text"] in seen:
+                continue
+            seen.add(post["text"])
+            post_id = post["id"] or f"t3_replay{len(seen)}"
+            group.append({"post_id": post_id, "title": post["text"], "selftext": "",
+                          "author": "", "author_href": "", "index": post.get("index")})
+    for group in groups:
+        if all(post["index"] is not None for post in group):
+            group.sort(key=lambda post: post["index"])
+    return [group for group in groups if group]
+
+
+def summarize(entries, prices, estimate=False):
+    """{stage: {requests, prompt, cached, completion, cost, p50, p95}}; prices are (prompt, cached, completion)."""
+    summary = {}
+    for entry in entries:
+        stats = summary.setdefault(entry["stage"], {"requests": 0, "prompt": 0, "cached": 0, "completion": 0,
+                                                    "latencies": []})
+        stats["requests"] += 1
+        usage = entry.get("usage") or {}
+        if estimate:
+            stats["prompt"] += estimate_tokens("".join(m.get("content") or "" for m in entry["messages"]))
+            stats["completion"] += estimate_tokens(entry.get("response") or "")
+        else:
+            stats["prompt"] += usage.get("prompt_tokens", 0)
+            stats["cached"] += usage.get("cached_tokens", 0)
+            stats["completion"] += usage.get("completion_tokens", 0)
+        if entry.get("latency_ms") is not None:
+            stats["latencies"].append(entry["latency_ms"])
+    for stats in summary.values():
+        latencies = sorted(stats.pop("latencies")) or [0.0]
+        uncached = stats["prompt"] - stats["cached"]
+        stats["cost"] = (uncached * prices[0] + stats["cached"] * prices[1] + stats["completion"] * prices[2]) / 1e6
+        stats["p50"] = statistics.median(latencies)
+        stats["p95"] = latencies[min(len(latencies) - 1, round(0.95 * len(latencies)) - 1)]
+    return summary
+
+
+def print_comparison(recorded, replayed):
+    header = (f"{'':<22}{'requests':>9}{'prompt tok':>12}{'cached':>9}{'compl tok':>11}{'cost $':>10}"
+              f"{'p50 ms':>9}{'p95 ms':>9}")
+    for stage in sorted(set(recorded) | set(replayed)):
+        print(f"\n{stage}\n{header}")
+        for name, summary in (("recorded", recorded), ("replayed", replayed)):
+            stats = summary.get(stage)
+            if stats is None:
+                print(f"  {name:<20}{'-':>9}")
+                continue
+            print(f"  {name:<20}{stats['requests']:>9}{stats['prompt']:>12}{stats['cached']:>9}"
+                  f"{stats['completion']:>11}{stats['cost']:>10.4f}{stats['p50']:>9.0f}{stats['p95']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", nargs="?", default=os.environ.get("TRAFFIC_LOG") or "classifier_traffic.jsonl.gz")
+    parser.add_argument("--speed", type=float, default=1.0, help="Scale recorded latencies (0 = no waiting)")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--gap", type=float, default=10.0,
+                        help="Seconds between recorded requests that start a new refresh")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N recorded requests")
+    parser.add_argument("--record", default=None, help="Also write the replayed traffic to this log")
+    parser.add_argument("--price-prompt", type=float, default=0.15, help="USD per 1M prompt tokens")
+    parser.add_argument("--price-cached", type=float, default=0.075, help="USD per 1M cached prompt tokens")
+    parser.add_argument("--price-completion", type=float, default=0.60, help="USD per 1M completion tokens")
+    parser.add_argument("--estimate-recorded", action="store_true",
+                        help="Estimate recorded token counts the way changed requests are estimated")
+    args = parser.parse_args()
+    if args.record and os.path.abspath(args.record) == os.path.abspath(args.log):
+        parser.error("--record must not be the log being replayed")
+
+    entries = list(traffic_log.read_traffic(args.log))
+    if args.limit is not None:
+        entries = entries[:args.limit]
+    if not entries:
+        raise SystemExit(f"No recorded traffic in {args.log}")
+    prices = (args.price_prompt, args.price_cached, args.price_completion)
+
+    baseline = replayed_requests(entries)
+    responder = ReplayResponder(entries, args.speed)
+    with FakeOpenAIServer(0.0, 0.0, 0.0, responder=responder) as server:
+        # Settings are read on first use, after the server and model are in the environment
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ["OPENAI_API_KEY"] = "fake-key"
+        # Unless another model is being tried, ask for the recorded one
+        recorded_model = statistics.mode(entry["model"] for entry in entries)
+        if recorded_model and not os.environ.get("OPENAI_MODEL"):
+            os.environ["OPENAI_MODEL"] = recorded_model
+        import classifier
+        from settings import get_settings
+        settings = get_settings()
+
+        # Collect the replayed requests instead of appending them to the recorded log
+        recorder = traffic_log.recorder = ListRecorder(traffic_log.TrafficRecorder(args.record)
+                                                       if args.record else None)
+        batch_size = args.batch_size or settings.ai_batch_size
+        concurrency = args.concurrency or settings.ai_concurrency
+
+        groups = refreshes(entries, args.gap)
+        message_texts = [entry["posts"][0]["text"] for entry in baseline if entry["stage"] == "message"]
+        start = time.perf_counter()
+        replayed_labels = {}
+        for group in groups:
+            analyses = classifier.classify_posts(group, batch_size=batch_size, concurrency=concurrency)
+            for post, analysis in zip(group, analyses):
+                if analysis is not None:
+                    replayed_labels[post["title"]] = analysis["is_hiring_post"]
+        for text in message_texts:
+            classifier.generate_message(text)
+        elapsed = time.perf_counter() - start
+        recorder.close()
+
+    recorded_labels = post_labels(entries)
+    common = [text for text in replayed_labels if text in recorded_labels]
+    agree = sum(replayed_labels[text] == recorded_labels[text] for text in common)
+
+    print(f"Replayed {len(baseline)} of {len(entries)} recorded requests from {args.log} "
+          f"({len(entries) - len(baseline)} repeats, retries and failed attempts left out): "
+          f"{sum(len(group) for group in groups)} posts in {len(groups)} refreshes, "
+          f"{len(message_texts)} messages, in {elapsed:.1f}s")
+    print(f"Classifier {settings.classifier_model} (prompt {classifier.PROMPT_VERSION}), "
+          f"batch size {batch_size}, concurrency {concurrency}, latency x{args.speed:g}")
+    print(f"Stand-in server: {responder.hits} identical to a recorded request, "
+          f"{responder.misses} changed (estimated tokens)")
+    print_comparison(summarize(baseline, prices, args.estimate_recorded), summarize(recorder.entries, prices))
+    if common:
+        print(f"\nAgreement with recorded labels: {agree}/{len(common)} posts ({agree / len(common):.1%})")
+
+
+if __name__ == "__main__":
+    main()
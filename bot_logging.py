@@ -0,0 +1,162 @@
+"""
+Logging setup for the bot.
+
+Records go to the rotating `hiring_dm_bot.log` as JSON lines (one object
+per record, with any `extra=` fields as top-level keys) and to the console
+as plain text. Both handlers sit behind a QueueHandler: the loop only puts
+records on an in-memory queue and a background QueueListener does the
+formatting and file I/O, so a slow disk never stalls a poll.
+An empty LOG_FILE logs to the console only (e.g. on Heroku, where the
+platform collects stdout/stderr and the disk is ephemeral).
+
+Raw payloads (AI responses, post text) are logged at DEBUG with
+`extra={"payload": ...}`; at DEBUG only a LOG_PAYLOAD_SAMPLE_RATE fraction
+of them is kept.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from datetime import datetime, timezone
+
+from settings import get_settings
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        # Records from the queue already carry the traceback rendered in exc_text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class PayloadSampler(logging.Filter):
+    """Keep only a sample_rate fraction of records that carry a payload."""
+
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if not hasattr(record, "payload") or self.sample_rate >= 1:
+            return True
+        return random.random() < self.sample_rate
+
+
+class SizeAndAgeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotate when the file grows past maxBytes or is older than max_age seconds."""
+
+    def __init__(self, filename, max_age=0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.max_age = max_age
+        self._opened_at = time.time()
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self._opened_at >= self.max_age:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._opened_at = time.time()
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback out of the message text."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def setup_logging(path=None, level=None, max_bytes=None, backup_count=None, rotate_hours=None,
+                  payload_sample_rate=None, console=None):
+    """
+    Route the root logger through a queue to the JSON log file (and console).
+
+    Arguments left as None come from the LOG_* settings. Safe to call more
+    than once; later calls replace the earlier handlers.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener (stopped at exit).
+    """
+    global _listener
+    settings = get_settings()
+    path = settings.log_file if path is None else path
+    level = settings.log_level if level is None else level
+    max_bytes = settings.log_max_bytes if max_bytes is None else max_bytes
+    backup_count = settings.log_backup_count if backup_count is None else backup_count
+    rotate_hours = settings.log_rotate_hours if rotate_hours is None else rotate_hours
+    payload_sample_rate = settings.log_payload_sample_rate if payload_sample_rate is None else payload_sample_rate
+    console = settings.log_console if console is None else console
+    stop_logging()
+
+    handlers = []
+    if path:
+        file_handler = SizeAndAgeRotatingFileHandler(
+            path, max_age=rotate_hours * 3600, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(PayloadSampler(payload_sample_rate))
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    # Third-party clients log every request at INFO/DEBUG
+    for noisy in ("httpx", "httpcore", "openai", "selenium", "urllib3"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and close the handlers."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(stop_logging)
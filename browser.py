@@ -0,0 +1,109 @@
+"""
+Chrome session setup for the Selenium bot.
+
+The bot only reads text and attributes from old.reddit pages, so by
+default images, fonts and media are blocked and pages are considered
+loaded at DOMContentLoaded ("eager"), which cuts bandwidth and memory
+for a browser that stays up for days.
+
+Blocking modes (BLOCK_RESOURCES):
+    cdp   - Network.setBlockedURLs via the DevTools protocol (default).
+            Nothing is written to the Chrome profile.
+    prefs - Chrome content-setting prefs (images only). These are saved
+            into the profile, so they also apply when it is used by hand.
+    off   - Load everything.
+"""
+import os
+
+from selenium import webdriver
+
+from settings import get_settings
+
+BLOCKED_URL_PATTERNS = [
+    # Images
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.thumbs.redditmedia.com/*", "*preview.redd.it/*", "*i.redd.it/*", "*external-preview.redd.it/*",
+    # Fonts
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # Audio / video
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.ogg", "*v.redd.it/*",
+]
+
+
+def build_chrome_options(profile_dir, block_resources, page_load_strategy, headless=False):
+    """Chrome options for the bot's persistent, signed-in profile."""
+    chrome_options = webdriver.ChromeOptions()
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.page_load_strategy = page_load_strategy
+    if headless:
+        chrome_options.add_argument("--headless=new")
+
+    if block_resources == "prefs":
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+    return chrome_options
+
+
+def create_driver(profile_dir=None, block_resources=None, page_load_strategy=None, headless=False):
+    """Launch Chrome with the configured loading strategy and resource blocking (None: from settings)."""
+    settings = get_settings()
+    profile_dir = settings.chrome_profile_dir if profile_dir is None else profile_dir
+    block_resources = settings.block_resources if block_resources is None else block_resources
+    page_load_strategy = settings.page_load_strategy if page_load_strategy is None else page_load_strategy
+    driver = webdriver.Chrome(options=build_chrome_options(
+        profile_dir, block_resources, page_load_strategy, headless))
+    if block_resources == "cdp":
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    return driver
+
+
+def chrome_rss_bytes(driver):
+    """
+    Resident memory of the chromedriver process and every Chrome process under it.
+
+    Reads /proc, so it only works on Linux; returns None elsewhere or if the
+    driver's process is gone.
+    """
+    service = getattr(driver, "service", None)
+    process = getattr(service, "process", None)
+    if process is None or not os.path.isdir("/proc"):
+        return None
+    return process_tree_rss_bytes(process.pid)
+
+
+def process_tree_rss_bytes(root_pid):
+    """Sum of VmRSS for a process and all of its descendants (Linux only)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The command name may contain spaces; fields resume after the last ')'
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+
+    total = 0
+    found = False
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+            found = True
+        except OSError:
+            continue
+        stack.extend(children.get(pid, []))
+    return total if found else None
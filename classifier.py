@@ -0,0 +1,552 @@
+"""
+Post classification and message writing with the OpenAI API.
+
+Shared by both entry points (reddit_bot.py with Chrome, reddit_bot_api.py
+without). Stage 1 classifies every post on a cheap model, batched and
+concurrent per listing refresh; stage 2 writes the outreach message only
+for hiring posts that will actually be contacted. Nothing here imports
+Selenium.
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+from typing import TypedDict
+
+from settings import async_openai_client, get_settings, openai_client
+from ai_cache import ClassificationCache
+import metrics
+import traffic_log
+from tracing import NOOP_SPAN, tracer
+
+log = logging.getLogger(__name__)
+
+# Bump whenever the prompt below changes so cached classifications are not reused
+PROMPT_VERSION = "v3"
+
+# A list of alternative openers for fallback cases
+openers = [
+    "Hey, your post caught my eye because I've got some relevant experience. Want to see if we're on the same page?",
+    "I've got some thoughts on how I might help. Care to discuss for a minute?",
+    "Hello! I noticed your post and I'm excited about the role. Can you share more details?",
+    "Hey! I believe I can bring something unique to your project. Can we chat about the specifics?",
+    "Hey just read your post. Do you mind if I ask a few questions?"
+]
+
+SYSTEM_PROMPT = "You are a confident, badass freelance developer who knows their craft inside out. Be creative, funny, sassy, and cool. GRAB ATTENTION with your personality while showing you're the expert they need. Sound like a boss, not a corporate drone."
+
+CLASSIFIER_SYSTEM_PROMPT = "You classify Reddit posts for a freelance software developer. Answer only in the requested JSON format."
+
+# Rules shared by the single-post and batch classification prompts
+CLASSIFICATION_RULES = """
+        ONLY answer true if they need someone to WRITE CODE, build software, create apps, or do programming work.
+        Answer false for:
+        - Video editors, graphic designers, content creators
+        - People offering services or selling products
+        - General tech discussions or non-coding jobs
+        - Any non-programming work
+"""
+
+MESSAGE_RULES = """
+        Your message MUST:
+        - Be 2-3 sentences max
+        - Sound casual, creative, and original - GRAB THEIR ATTENTION!
+        - Be funny, sassy, and cool - sound like a boss who knows their shit
+        - Show you understood what they're looking for (briefly mention the project/tech)
+        - Write in first person (I/me) as a confident freelance developer
+        - If it's app development (mobile apps): mention "vastcom.us"
+        - If it's other software development: mention "nofeelance.com"
+        
+        Examples of good messages:
+        "React e-commerce? Been there, crushed that. I live and breathe JSX - check out my playground at nofeelance.com"
+        "Mobile apps are my jam! I've launched more iOS/Android apps than I can count. Peep my work at vastcom.us"
+        "Python automation is literally my superpower. I make scripts so smooth they practically write themselves - nofeelance.com"
+"""
+
+# Full instructions for each request type. Everything static comes first and
+# the post content goes last, in the user message, so every request of a
+# type starts with the same tokens and the API can reuse its cached prefix.
+POST_CLASSIFIER_PROMPT = f"""{CLASSIFIER_SYSTEM_PROMPT}
+
+        Decide whether the post in the user message is someone HIRING a SOFTWARE DEVELOPER/PROGRAMMER for coding work.
+{CLASSIFICATION_RULES}
+        {{
+            "is_hiring_post": true/false
+        }}
+        """
+
+BATCH_CLASSIFIER_PROMPT = f"""{CLASSIFIER_SYSTEM_PROMPT}
+
+        The user message is a JSON array of posts (objects with "id" and "text").
+        For EACH post, decide whether it is someone HIRING a SOFTWARE DEVELOPER/PROGRAMMER for coding work.
+{CLASSIFICATION_RULES}
+        Respond with one JSON object containing exactly one result per post id:
+        {{
+            "results": [
+                {{"id": "post id", "is_hiring_post": true/false}}
+            ]
+        }}
+        """
+
+MESSAGE_WRITER_PROMPT = f"""{SYSTEM_PROMPT}
+
+        Write a chat message to the author of the post in the user message, who is HIRING a software developer.
+{MESSAGE_RULES}
+        Reply with the message text only.
+        """
+
+class PostAnalysis(TypedDict):
+    """Typed result of analyzing one post. Classification alone leaves message empty."""
+    is_hiring_post: bool
+    message: str
+
+class SchemaError(ValueError):
+    """The model's reply did not match the expected JSON schema."""
+
+# Structured-output formats: the API guarantees replies that match these schemas
+CLASSIFICATION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "post_classification",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {"is_hiring_post": {"type": "boolean"}},
+            "required": ["is_hiring_post"],
+            "additionalProperties": False
+        }
+    }
+}
+
+BATCH_CLASSIFICATION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "batch_post_classification",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"id": {"type": "string"}, "is_hiring_post": {"type": "boolean"}},
+                        "required": ["id", "is_hiring_post"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["results"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Replies that failed schema validation, and the retries they caused
+ai_stats = {
+    "parse_failures": 0,
+    "schema_retries": 0
+}
+
+# Token usage per stage ("classify" / "message"); cached_tokens is the part of
+# prompt_tokens the API served from its prompt cache (billed at a discount)
+token_usage = {
+    stage: {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    for stage in ("classify", "message")
+}
+
+# Groups requests with the same prompt prefix onto the same API cache, per prompt type.
+# Sent in extra_body: openai releases before 1.98 reject prompt_cache_key as a keyword.
+PROMPT_CACHE_KEYS = {name: f"hiring-bot-{name}-{PROMPT_VERSION}" for name in ("classify", "batch", "message")}
+
+# The listing refresh being classified, for the traffic log: (refresh id, {post_id: listing index}).
+# Batches finish, and are logged, out of order; replay rebuilds each refresh from these.
+_refresh = contextvars.ContextVar("refresh", default=None)
+
+def cached_tokens(usage) -> int:
+    """Prompt tokens served from the API's prompt cache (0 if not reported)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None) or 0
+
+def record_usage(stage: str, response):
+    """Add a completion's token usage to the per-stage totals."""
+    usage = getattr(response, "usage", None)
+    totals = token_usage[stage]
+    totals["calls"] += 1
+    metrics.CLASSIFIER_CALLS.inc(stage=stage)
+    if usage is not None:
+        cached = cached_tokens(usage)
+        totals["prompt_tokens"] += usage.prompt_tokens or 0
+        totals["cached_tokens"] += cached
+        totals["completion_tokens"] += usage.completion_tokens or 0
+        metrics.TOKENS_USED.inc(usage.prompt_tokens or 0, stage=stage, kind="prompt")
+        metrics.TOKENS_USED.inc(cached, stage=stage, kind="cached")
+        metrics.TOKENS_USED.inc(usage.completion_tokens or 0, stage=stage, kind="completion")
+        # Token counts on the request span and totalled on the post's trace
+        span = tracer.current_span()
+        span.set_attributes(**{"llm.prompt_tokens": usage.prompt_tokens or 0,
+                               "llm.cached_tokens": cached,
+                               "llm.completion_tokens": usage.completion_tokens or 0})
+        span.root.add("tokens.prompt", usage.prompt_tokens or 0)
+        span.root.add("tokens.cached", cached)
+        span.root.add("tokens.completion", usage.completion_tokens or 0)
+
+def record_traffic(stage: str, model, messages, posts, response=None, latency=None, attempts=1, error=None):
+    """Append one OpenAI call, with its parsed reply, to the traffic log (traffic_log.py)."""
+    recorder = traffic_log.get_recorder()
+    if recorder is None:
+        return
+    refresh_id, positions = _refresh.get() or (None, {})
+    if positions:
+        posts = [{**post, "index": positions.get(post["id"])} for post in posts]
+    result = content = finish_reason = None
+    usage = getattr(response, "usage", None)
+    if response is not None:
+        choice = response.choices[0]
+        content, finish_reason = choice.message.content, choice.finish_reason
+        if stage == "message":
+            result = (content or "").strip().strip('"')
+        else:
+            try:
+                result = _reply_json(response)
+            except SchemaError as e:
+                error = error or e
+    recorder.record({
+        "time": time.time(),
+        "stage": stage,
+        "refresh": refresh_id,
+        "prompt_version": PROMPT_VERSION,
+        "model": model,
+        "input_hash": traffic_log.request_hash(model, messages),
+        "posts": posts,
+        "messages": messages,
+        "response": content,
+        "finish_reason": finish_reason,
+        "result": result,
+        "error": f"{type(error).__name__}: {error}" if error is not None else None,
+        "latency_ms": round(latency * 1000, 1) if latency is not None else None,
+        "attempts": attempts,
+        "usage": {
+            "prompt_tokens": usage.prompt_tokens or 0,
+            "cached_tokens": cached_tokens(usage),
+            "completion_tokens": usage.completion_tokens or 0,
+        } if usage is not None else None,
+    })
+
+def post_text(post: dict) -> str:
+    """Combine title + body of a parsed listing post."""
+    return f"{post['title']} {post['selftext']}".strip()
+
+def _reply_json(response):
+    """Decode the JSON body of a completion, raising SchemaError on refusals or bad JSON."""
+    choice = response.choices[0]
+    if getattr(choice.message, "refusal", None):
+        raise SchemaError(f"model refused: {choice.message.refusal}")
+    try:
+        return json.loads(choice.message.content)
+    except (TypeError, json.JSONDecodeError) as e:
+        raise SchemaError(f"invalid JSON (finish_reason={choice.finish_reason}): {e}") from e
+
+def to_post_analysis(data) -> PostAnalysis:
+    """Validate a decoded classification object as a PostAnalysis (without a message)."""
+    if not isinstance(data, dict) or not isinstance(data.get("is_hiring_post"), bool):
+        raise SchemaError(f"unexpected classification object: {data!r}")
+    return {
+        "is_hiring_post": data["is_hiring_post"],
+        "message": ""
+    }
+
+def parse_post_analysis(response) -> PostAnalysis:
+    """Typed classification from a single-post completion."""
+    return to_post_analysis(_reply_json(response))
+
+def build_post_messages(full_post_text: str) -> list:
+    """Chat messages asking the model to classify a single post."""
+    return [
+        {"role": "system", "content": POST_CLASSIFIER_PROMPT},
+        {"role": "user", "content": f'Post: "{full_post_text}"'}
+    ]
+
+def build_batch_messages(batch: list) -> list:
+    """Chat messages asking the model to classify several posts at once."""
+    posts_json = json.dumps(
+        [{"id": post["post_id"], "text": post_text(post)} for post in batch],
+        ensure_ascii=False,
+    )
+    return [
+        {"role": "system", "content": BATCH_CLASSIFIER_PROMPT},
+        {"role": "user", "content": posts_json}
+    ]
+
+def build_message_messages(full_post_text: str) -> list:
+    """Chat messages asking the model to write a DM for a confirmed hiring post."""
+    return [
+        {"role": "system", "content": MESSAGE_WRITER_PROMPT},
+        {"role": "user", "content": f'Post: "{full_post_text}"'}
+    ]
+
+def parse_batch_results(response, batch: list) -> dict:
+    """Map a batch completion back to post ids; entries for unknown ids are dropped."""
+    data = _reply_json(response)
+    if not isinstance(data, dict) or not isinstance(data.get("results"), list):
+        raise SchemaError(f"unexpected batch object: {data!r}")
+    batch_ids = {post["post_id"] for post in batch}
+    results = {}
+    for item in data["results"]:
+        if isinstance(item, dict) and item.get("id") in batch_ids:
+            results[item["id"]] = to_post_analysis(item)
+    return results
+
+def generate_message(full_post_text: str) -> str:
+    """
+    Stage 2: write the outreach message for a confirmed hiring post.
+
+    Runs on MESSAGE_MODEL at MESSAGE_TEMPERATURE. Falls back to one of the
+    stock openers if the call fails or comes back empty.
+    """
+    settings = get_settings()
+    try:
+        messages = build_message_messages(full_post_text)
+        with tracer.span("openai.chat.completions", **{"llm.model": settings.message_model, "llm.stage": "message"}), \
+                metrics.LLM_CALL_SECONDS.time(stage="message"):
+            start = time.perf_counter()
+            response = openai_client().chat.completions.create(
+                model=settings.message_model,
+                messages=messages,
+                temperature=settings.message_temperature,
+                max_completion_tokens=settings.message_max_tokens,
+                extra_body={"prompt_cache_key": PROMPT_CACHE_KEYS["message"]}
+            )
+            record_usage("message", response)
+        record_traffic("message", settings.message_model, messages, [{"id": None, "text": full_post_text}],
+                       response, time.perf_counter() - start)
+        message = (response.choices[0].message.content or "").strip().strip('"')
+        if message:
+            return message
+        log.warning("AI returned an empty message, using a stock opener")
+    except Exception as e:
+        log.error("Error generating message: %s: %s", type(e).__name__, e)
+    return random.choice(openers)
+
+def classify_posts(posts: list, cache: ClassificationCache = None, batch_size: int = None,
+                   concurrency: int = None) -> list:
+    """
+    Classify all posts from one listing refresh concurrently (stage 1 only).
+
+    Cached posts are answered locally. The rest are grouped into batches of
+    batch_size (default AI_BATCH_SIZE) and sent through a pool of at most
+    `concurrency` in-flight requests (default AI_CONCURRENCY), so a refresh
+    takes roughly the slowest request rather than the sum of all of them.
+    Posts a batch reply does not cover fall back to single-post requests.
+
+    Returns:
+        list[PostAnalysis | None]: One classification per post, in the same (listing) order.
+            None for a post that could not be classified (schema failure after the retry,
+            rate limits or timeouts after all retries, any other API error), so the caller
+            can leave it for the next refresh instead of treating it as not hiring.
+    """
+    return asyncio.run(classify_posts_async(posts, cache, batch_size, concurrency))
+
+async def classify_posts_async(posts, cache=None, batch_size=None, concurrency=None, aclient=None):
+    settings = get_settings()
+    batch_size = settings.ai_batch_size if batch_size is None else batch_size
+    concurrency = settings.ai_concurrency if concurrency is None else concurrency
+    model = settings.classifier_model
+    token = _refresh.set((os.urandom(6).hex(), {post["post_id"]: index for index, post in enumerate(posts)}))
+    try:
+        results = [None] * len(posts)
+        pending = []
+        # One "classify" span per post, open until the whole refresh is classified
+        spans = {post["post_id"]: tracer.trace(post["post_id"]).child("classify", **{"llm.model": model})
+                 for post in posts}
+        for index, post in enumerate(posts):
+            cached = cache.get(post_text(post), model, PROMPT_VERSION) if cache is not None else None
+            spans[post["post_id"]].set_attribute("cache.hit", cached is not None)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, post))
+
+        if not pending:
+            _end_classify_spans(posts, results, spans)
+            return results
+
+        # A fresh client per refresh: its connection pool is bound to this event loop.
+        # SDK retries are off because request_completion does its own 429 backoff.
+        owns_client = aclient is None
+        if owns_client:
+            aclient = async_openai_client(max_retries=0)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        try:
+            batch_size = max(1, batch_size)
+            chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            chunk_results = await asyncio.gather(*(
+                _classify_chunk(aclient, semaphore, model, chunk, spans) for chunk in chunks
+            ))
+        finally:
+            if owns_client:
+                await aclient.close()
+
+        for chunk, analyses in zip(chunks, chunk_results):
+            for (index, post), analysis in zip(chunk, analyses):
+                results[index] = analysis
+                if analysis is not None and cache is not None:
+                    cache.put(post_text(post), model, PROMPT_VERSION, analysis)
+        _end_classify_spans(posts, results, spans)
+        return results
+    finally:
+        _refresh.reset(token)
+
+def _end_classify_spans(posts, results, spans):
+    for post, analysis in zip(posts, results):
+        spans[post["post_id"]].set_attribute("classify.is_hiring_post", bool(analysis and analysis["is_hiring_post"]))
+        spans[post["post_id"]].end()
+
+def _trace_batch_request(batch, spans, model, start_ns, response=None, error=None):
+    """Add the shared batch request to each post's classify span, with its share of the tokens."""
+    end_ns = time.time_ns()
+    usage = getattr(response, "usage", None)
+    for post in batch:
+        span = spans.get(post["post_id"], NOOP_SPAN).child(
+            "openai.chat.completions", start_ns=start_ns,
+            **{"llm.model": model, "llm.stage": "classify", "llm.batch_size": len(batch)})
+        if usage is not None:
+            prompt_share = (usage.prompt_tokens or 0) / len(batch)
+            cached_share = cached_tokens(usage) / len(batch)
+            completion_share = (usage.completion_tokens or 0) / len(batch)
+            span.set_attributes(**{"llm.prompt_tokens": prompt_share, "llm.cached_tokens": cached_share,
+                                   "llm.completion_tokens": completion_share})
+            span.root.add("tokens.prompt", prompt_share)
+            span.root.add("tokens.cached", cached_share)
+            span.root.add("tokens.completion", completion_share)
+        if error is not None:
+            span.record_exception(error)
+        span.end(end_ns)
+
+async def _classify_chunk(aclient, semaphore, model, chunk, spans=None):
+    """Returns the analysis for each (index, post) in the chunk, None where classification failed."""
+    spans = spans or {}
+    batch = [post for _, post in chunk]
+    batch_results = {}
+    if len(batch) > 1:
+        start_ns = time.time_ns()
+        response = batch_error = None
+        try:
+            response = await request_completion(aclient, semaphore, model, build_batch_messages(batch),
+                                                BATCH_CLASSIFICATION_FORMAT,
+                                                get_settings().classifier_max_tokens * len(batch), batch)
+            log.debug("Raw AI batch response", extra={"payload": response.choices[0].message.content,
+                                                      "post_ids": [post["post_id"] for post in batch]})
+            batch_results = parse_batch_results(response, batch)
+        except SchemaError as e:
+            # The single-post calls below are this batch's one retry
+            batch_error = e
+            ai_stats["parse_failures"] += 1
+            metrics.PARSE_FAILURES.inc()
+            ai_stats["schema_retries"] += 1
+            log.warning("Batch response did not match schema, falling back to single calls: %s", e)
+        except Exception as e:
+            batch_error = e
+            log.warning("Batch analysis failed for %d posts, falling back to single calls: %s: %s",
+                        len(batch), type(e).__name__, e)
+        _trace_batch_request(batch, spans, model, start_ns, response, batch_error)
+
+    missing = [post for post in batch if post["post_id"] not in batch_results]
+    if len(batch) > 1:
+        for post in missing:
+            log.info("No batch result for post %s, analyzing it on its own", post["post_id"],
+                     extra={"post_id": post["post_id"]})
+    singles = await asyncio.gather(*(
+        _classify_single(aclient, semaphore, model, post, spans.get(post["post_id"], NOOP_SPAN))
+        for post in missing
+    ))
+    single_results = {post["post_id"]: result for post, result in zip(missing, singles)}
+
+    return [batch_results.get(post["post_id"]) or single_results[post["post_id"]] for post in batch]
+
+async def _classify_single(aclient, semaphore, model, post, span=NOOP_SPAN):
+    # Requests made here become children of the post's classify span
+    with tracer.activate(span):
+        try:
+            for attempt in range(2):
+                response = await request_completion(aclient, semaphore, model,
+                                                    build_post_messages(post_text(post)), CLASSIFICATION_FORMAT,
+                                                    get_settings().classifier_max_tokens, [post])
+                log.debug("Raw AI response", extra={"payload": response.choices[0].message.content,
+                                                    "post_id": post["post_id"]})
+                try:
+                    return parse_post_analysis(response)
+                except SchemaError as e:
+                    ai_stats["parse_failures"] += 1
+                    metrics.PARSE_FAILURES.inc()
+                    log.warning("AI response for post %s did not match schema: %s", post["post_id"], e,
+                                extra={"post_id": post["post_id"]})
+                    if attempt == 0:
+                        ai_stats["schema_retries"] += 1
+        except Exception as e:
+            log.error("Error with AI analysis of post %s: %s: %s", post["post_id"], type(e).__name__, e,
+                      extra={"post_id": post["post_id"]})
+        return None
+
+async def request_completion(aclient, semaphore, model, messages, response_format,
+                             max_completion_tokens, posts=()):
+    """
+    One classification completion with bounded concurrency, a per-request timeout
+    and backoff on rate limits (honouring Retry-After), timeouts and connection errors.
+
+    `posts` (the posts the prompt covers) is only used for the traffic log.
+    """
+    from openai import APIConnectionError, RateLimitError
+
+    settings = get_settings()
+    traffic_posts = [{"id": post["post_id"], "text": post_text(post)} for post in posts]
+    prompt_cache_key = PROMPT_CACHE_KEYS["batch" if response_format is BATCH_CLASSIFICATION_FORMAT else "classify"]
+    with tracer.span("openai.chat.completions", **{"llm.model": model, "llm.stage": "classify"}) as span:
+        for attempt in range(settings.ai_max_retries + 1):
+            try:
+                async with semaphore:
+                    start = time.perf_counter()
+                    with metrics.LLM_CALL_SECONDS.time(stage="classify"):
+                        response = await asyncio.wait_for(
+                            aclient.chat.completions.create(
+                                model=model,
+                                messages=messages,
+                                response_format=response_format,
+                                temperature=settings.classifier_temperature,
+                                max_completion_tokens=max_completion_tokens,
+                                extra_body={"prompt_cache_key": prompt_cache_key}
+                            ),
+                            timeout=settings.ai_request_timeout
+                        )
+                span.set_attribute("llm.attempts", attempt + 1)
+                record_usage("classify", response)
+                record_traffic("classify", model, messages, traffic_posts, response,
+                               time.perf_counter() - start, attempt + 1)
+                return response
+            except (RateLimitError, APIConnectionError, asyncio.TimeoutError) as e:
+                if attempt == settings.ai_max_retries:
+                    record_traffic("classify", model, messages, traffic_posts,
+                                   latency=time.perf_counter() - start, attempts=attempt + 1, error=e)
+                    raise
+                delay = _retry_delay(e, attempt)
+                log.warning("%s from OpenAI, retrying in %.1fs (attempt %d/%d)",
+                            type(e).__name__, delay, attempt + 1, settings.ai_max_retries)
+                metrics.SLEEP_SECONDS.observe(delay, reason="ai_retry")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                record_traffic("classify", model, messages, traffic_posts,
+                               latency=time.perf_counter() - start, attempts=attempt + 1, error=e)
+                raise
+
+def _retry_delay(error, attempt):
+    """Use the server's Retry-After when given, else exponential backoff with jitter."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    return min(30.0, 2 ** attempt) * random.uniform(0.5, 1.5)
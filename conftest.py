@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+import traffic_log
+from settings import get_settings, openai_client
+
+
+class FakeClock:
+    """Stands in for time.time(); tests move it forward by hand."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def fake_settings(monkeypatch):
+    """Settings for a fake model with the traffic log off, parsed afresh for this test."""
+    monkeypatch.setenv("OPENAI_API_KEY", "fake-key")
+    monkeypatch.setenv("OPENAI_MODEL", "fake-model")
+    monkeypatch.setattr(traffic_log, "recorder", None)
+    monkeypatch.setattr(traffic_log, "_configured", True)
+    get_settings.cache_clear()
+    openai_client.cache_clear()
+    yield get_settings()
+    get_settings.cache_clear()
+    openai_client.cache_clear()
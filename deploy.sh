@@ -24,9 +24,16 @@ heroku config:set REDDIT_CLIENT_SECRET="your_reddit_client_secret"
 heroku config:set REDDIT_USER_AGENT="HiringBot/1.0 by YourUsername"
 heroku config:set REDDIT_USERNAME="your_reddit_username"
 heroku config:set REDDIT_PASSWORD="your_reddit_password"
+# Browser-free worker (Procfile): RSS budget of a Standard-1X dyno
+heroku config:set MEMORY_BUDGET_MB=512
+# Leads are written to stdout; a log drain keeps them past Heroku's short log buffer
+# heroku drains:add <syslog-or-https-url>
 
 # Deploy to Heroku
 git push heroku main
 
+# Run the worker dyno (there is no web process)
+heroku ps:scale worker=1
+
 echo "Deployment complete!"
 echo "Check your app logs with: heroku logs --tail"
@@ -0,0 +1,169 @@
+"""
+Health monitor for the long-running Chrome session.
+
+The monitor loop keeps one WebDriver alive for days. DriverSupervisor owns
+that driver and replaces it when it stops answering, when Chrome's memory
+grows past a limit, when it gets too old, or after several cycles in a
+row failed because of the browser (a WebDriver error or a lost
+chromedriver connection, in the listing read or the chat sink). OpenAI,
+SQLite or .json fetch errors do not count against Chrome. Everything else (author store, seen posts, caches, scheduler)
+lives outside the driver, so it survives a recycle untouched.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError as DriverConnectionError
+
+from browser import chrome_rss_bytes, create_driver
+from settings import get_settings
+
+log = logging.getLogger(__name__)
+
+
+def is_driver_error(error):
+    """True for failures that come from Chrome or chromedriver rather than the rest of the cycle."""
+    return isinstance(error, (WebDriverException, DriverConnectionError, ConnectionError))
+
+
+class DriverSupervisor:
+    """
+    Own the WebDriver and recycle it when it becomes unhealthy.
+
+    Args:
+        factory (callable): Returns a new WebDriver.
+        max_rss_mb (float): Recycle when Chrome's process tree exceeds this (0 disables).
+        max_failures (int): Recycle after this many consecutive cycles with a browser failure.
+        max_age_hours (float): Recycle sessions older than this (0 disables).
+        ping_timeout (float): Seconds the driver has to answer a health probe.
+    """
+
+    def __init__(self, factory=create_driver, max_rss_mb=1500.0, max_failures=3,
+                 max_age_hours=24.0, ping_timeout=10.0):
+        self.factory = factory
+        self.max_rss_mb = max_rss_mb
+        self.max_failures = max_failures
+        self.max_age_hours = max_age_hours
+        self.ping_timeout = ping_timeout
+        self.consecutive_failures = 0
+        self._cycle_failed = False
+        self.restarts = []  # {"time", "reason", "rss_mb"} per recycle
+        self.last_rss_mb = None
+        self._driver = None
+        self._started_at = None
+        self._probe_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-probe")
+
+    @classmethod
+    def from_env(cls, factory=create_driver):
+        """Build a supervisor from the DRIVER_* settings."""
+        settings = get_settings()
+        return cls(
+            factory=factory,
+            max_rss_mb=settings.driver_max_rss_mb,
+            max_failures=settings.driver_max_failures,
+            max_age_hours=settings.driver_max_age_hours,
+            ping_timeout=settings.driver_ping_timeout,
+        )
+
+    @property
+    def driver(self):
+        """The current driver, started on first use."""
+        if self._driver is None:
+            self._start()
+        return self._driver
+
+    def check(self):
+        """
+        Probe the driver and recycle it if any threshold is exceeded.
+
+        Returns:
+            str | None: The recycle reason, or None if the driver is healthy.
+        """
+        self._cycle_failed = False
+        reason = self._unhealthy_reason()
+        if reason:
+            self.recycle(reason)
+        return reason
+
+    def record_success(self):
+        # A cycle that completed after a failed chat still counts as failed
+        if not self._cycle_failed:
+            self.consecutive_failures = 0
+
+    def record_failure(self, error=None):
+        """Count a browser failure; recycles once max_failures is reached. Other errors are ignored."""
+        if not is_driver_error(error):
+            return
+        self._cycle_failed = True
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.max_failures:
+            self.recycle(f"{self.consecutive_failures} consecutive failures (last: {error})")
+
+    def recycle(self, reason):
+        """Quit the current driver and start a fresh one."""
+        log.warning("Recycling Chrome session: %s", reason, extra={"rss_mb": self.last_rss_mb})
+        self.restarts.append({"time": time.time(), "reason": reason, "rss_mb": self.last_rss_mb})
+        self._quit()
+        self.consecutive_failures = 0
+        self._start()
+
+    def close(self):
+        self._quit()
+        self._probe_pool.shutdown(wait=False)
+
+    def stats(self):
+        """Current health figures, for logging and metrics."""
+        return {
+            "restarts": len(self.restarts),
+            "consecutive_failures": self.consecutive_failures,
+            "rss_mb": self.last_rss_mb,
+            "age_hours": (time.monotonic() - self._started_at) / 3600 if self._started_at else 0.0,
+        }
+
+    def log_stats(self):
+        health = self.stats()
+        rss = f"{health['rss_mb']:.0f} MB" if health["rss_mb"] is not None else "unknown"
+        log.info("Chrome: %s RSS, session %.1fh old, %d restart(s)",
+                 rss, health["age_hours"], health["restarts"], extra={"chrome": health})
+
+    def _unhealthy_reason(self):
+        if self._driver is None:
+            return None
+
+        probe = self._probe_pool.submit(self._driver.execute_script, "return document.readyState")
+        try:
+            probe.result(timeout=self.ping_timeout)
+        except FutureTimeout:
+            # The hung probe keeps its worker busy; use a fresh one from now on
+            self._probe_pool.shutdown(wait=False)
+            self._probe_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="driver-probe")
+            return f"no response to health probe within {self.ping_timeout:g}s"
+        except Exception as e:
+            return f"health probe failed: {type(e).__name__}: {e}"
+
+        rss = chrome_rss_bytes(self._driver)
+        self.last_rss_mb = rss / 1024 / 1024 if rss is not None else None
+        if self.max_rss_mb and self.last_rss_mb and self.last_rss_mb > self.max_rss_mb:
+            return f"Chrome RSS {self.last_rss_mb:.0f} MB over {self.max_rss_mb:.0f} MB"
+
+        age_hours = (time.monotonic() - self._started_at) / 3600
+        if self.max_age_hours and age_hours > self.max_age_hours:
+            return f"session age {age_hours:.1f}h over {self.max_age_hours:.1f}h"
+        return None
+
+    def _start(self):
+        self._driver = self.factory()
+        self._started_at = time.monotonic()
+
+    def _quit(self):
+        if self._driver is None:
+            return
+        driver, self._driver = self._driver, None
+        try:
+            driver.quit()
+        except Exception as e:
+            log.error("Error quitting Chrome, killing chromedriver: %s", e)
+            process = getattr(getattr(driver, "service", None), "process", None)
+            if process is not None:
+                process.kill()
@@ -0,0 +1,149 @@
+"""
+Browser-free, read-only fetcher for the job multireddit.
+
+Pulls the `.json` version of the listing over one keep-alive httpx client
+instead of rendering the page in Chrome, and returns the same post records
+as listing_parser.parse_listing. Reading the feed costs one small HTTP
+response and needs no browser.
+
+Polling is incremental: after the first fetch only posts newer than a
+`before=` cursor are requested, and the last response's ETag /
+Last-Modified are sent back so an unchanged listing costs a 304 with no
+body. The cursor only moves in commit_cursor(), once the pipeline has
+handled the fetched posts, and never past the oldest one it left unseen
+(a failed classification), so that post is fetched again next poll.
+
+Usage (prints the current listing):
+    python listing_fetcher.py
+"""
+import httpx
+
+from listing_parser import BASE_URL, parse_listing_json
+from metrics import LISTING_FETCH_SECONDS, LISTING_PARSE_SECONDS
+from settings import get_settings
+
+LISTING_URL = "https://old.reddit.com/user/gemini_caroline/m/job/new/"
+
+
+class ListingFetcher:
+    """
+    Fetch a listing's posts from its `.json` endpoint.
+
+    Args:
+        url (str): The listing page URL (the `.json` suffix is added).
+        limit (int): Posts per request (Reddit allows up to 100).
+        timeout (float): Seconds per request.
+        full_refresh_every (int): Drop the cursor every N polls and fetch the
+            full first page, in case the cursor post was deleted (Reddit then
+            returns nothing for `before=` forever). 0 disables this.
+        client (httpx.Client, optional): Shared client; one is created if omitted.
+        not_before (float, optional): Leave out posts submitted before this Unix time.
+    """
+
+    def __init__(self, url=LISTING_URL, limit=25, timeout=15.0, full_refresh_every=30, client=None,
+                 not_before=None):
+        self.json_url = url.rstrip("/") + "/.json"
+        self.limit = limit
+        self.full_refresh_every = full_refresh_every
+        self.not_before = not_before
+        self.newest_fullname = None
+        self._page = []  # fullnames of the last uncommitted response, newest first
+        self._returned = set()  # the ones of them handed to the caller
+        self.polls = 0
+        self.not_modified = 0
+        self._validators = {}  # request params -> (ETag, Last-Modified) of the last 200
+        self._owns_client = client is None
+        self.client = client or httpx.Client(
+            headers={"User-Agent": get_settings().reddit_user_agent},
+            timeout=timeout,
+            follow_redirects=True,
+        )
+
+    def fetch(self, skip=None):
+        """
+        Fetch posts newer than the cursor; call commit_cursor() once they are handled.
+
+        Args:
+            skip (callable, optional): Called with each fullname; matching posts are left out.
+
+        Returns:
+            list[dict] | None: Post dicts in listing order, or None if the server
+            answered 304 Not Modified (nothing to parse, dedup or classify).
+        """
+        self.polls += 1
+        if self._page:
+            # The last response was never committed (the cycle failed): fetch it in full again
+            self._validators = {}
+        if self.full_refresh_every and self.polls % self.full_refresh_every == 0:
+            self.newest_fullname = None
+
+        params = {"limit": self.limit, "raw_json": 1}
+        if self.newest_fullname:
+            # Only ask for newer posts; the listing can't have more than one
+            # page of them between polls, so ask for a full page of 100
+            params.update(before=self.newest_fullname, limit=100)
+        key = tuple(sorted(params.items()))
+
+        headers = {}
+        etag, last_modified = self._validators.get(key, (None, None))
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        with LISTING_FETCH_SECONDS.time(source="json"):
+            response = self.client.get(self.json_url, params=params, headers=headers)
+        if response.status_code == 304:
+            self.not_modified += 1
+            return None
+        response.raise_for_status()
+
+        # Validators only make sense for the exact request they came from
+        self._validators = {key: (response.headers.get("ETag"), response.headers.get("Last-Modified"))}
+
+        with LISTING_PARSE_SECONDS.time(format="json"):
+            data = response.json()
+            posts = parse_listing_json(data, base_url=BASE_URL, skip=skip)
+        if self.not_before is not None:
+            posts = [post for post in posts if post["created_utc"] >= self.not_before]
+        self._page = [child["data"]["name"] for child in data.get("data", {}).get("children", [])]
+        self._returned = {post["post_id"] for post in posts}
+        return posts
+
+    def commit_cursor(self, seen):
+        """
+        Move the cursor past the last fetched posts that are now in `seen`.
+
+        Call after the posts from fetch() have been processed. Posts fetch()
+        left out (skipped, deleted, too old) count as handled. If a returned
+        post is still unseen, the cursor stops just past the oldest such post
+        and the cached validators are dropped, so the next poll returns it
+        again instead of a 304.
+        """
+        page, self._page = self._page, []
+        unseen = [index for index, name in enumerate(page) if name in self._returned and name not in seen]
+        if not unseen:
+            if page:
+                # Listings are newest first
+                self.newest_fullname = page[0]
+            return
+        self._validators = {}
+        oldest = unseen[-1]
+        if oldest + 1 < len(page):
+            self.newest_fullname = page[oldest + 1]
+
+    def close(self):
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    with ListingFetcher() as fetcher:
+        for post in fetcher.fetch():
+            print(f"{post['post_id']}  u/{post['author']}: {post['title']}")
@@ -0,0 +1,112 @@
+"""
+Parse an old.reddit listing page in one pass.
+
+Instead of calling find_element on every `.thing` (one WebDriver round-trip
+per call), take `driver.page_source` once and extract every post locally
+with lxml. Works the same on saved HTML fixtures, so it can be benchmarked
+offline (see benchmarks/bench_listing_parser.py).
+
+parse_listing_json produces the same post records from the `.json`
+listing endpoint, for the browser-free fetcher in listing_fetcher.py.
+"""
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+BASE_URL = "https://old.reddit.com"
+
+THING_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' thing ')][@data-fullname]"
+TITLE_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' title ')]"
+AUTHOR_XPATH = ".//a[contains(concat(' ', normalize-space(@class), ' '), ' author ')]"
+SELFTEXT_XPATH = ".//div[contains(concat(' ', normalize-space(@class), ' '), ' usertext-body ')]"
+
+
+def parse_listing(page_source, base_url=BASE_URL, skip=None):
+    """
+    Extract posts from an old.reddit listing page.
+
+    Args:
+        page_source (str): Raw HTML of the listing page.
+        base_url (str): Used to resolve relative author links.
+        skip (callable, optional): Called with each post's fullname before any
+            text is extracted; posts for which it returns True are left out.
+
+    Returns:
+        list[dict]: One dict per post, in listing order: {
+            "post_id": str,       # data-fullname, e.g. "t3_1igm8qm"
+            "title": str,
+            "author": str,
+            "author_href": str,
+            "selftext": str
+        }
+        Things without an author (deleted posts, ads) are skipped.
+    """
+    tree = lxml_html.fromstring(page_source)
+    posts = []
+    for thing in tree.xpath(THING_XPATH):
+        post_id = thing.get("data-fullname")
+        if skip is not None and skip(post_id):
+            continue
+
+        author_links = thing.xpath(AUTHOR_XPATH)
+        if not author_links:
+            continue
+        author_link = author_links[0]
+
+        title_links = thing.xpath(TITLE_XPATH)
+        title = _clean_text(title_links[0].text_content()) if title_links else ""
+
+        body_elements = thing.xpath(SELFTEXT_XPATH)
+        selftext = _clean_text(body_elements[0].text_content()) if body_elements else ""
+
+        posts.append({
+            "post_id": post_id,
+            "title": title,
+            "author": _clean_text(author_link.text_content()),
+            "author_href": urljoin(base_url, author_link.get("href", "")),
+            "selftext": selftext,
+        })
+    return posts
+
+
+def parse_listing_json(data, base_url=BASE_URL, skip=None):
+    """
+    Extract posts from a decoded `.json` listing response.
+
+    Args:
+        data (dict): The listing object returned by Reddit.
+        base_url (str): Used to build author profile links.
+        skip (callable, optional): Same as for parse_listing.
+
+    Returns:
+        list[dict]: Post dicts with the same keys as parse_listing, plus
+        "created_utc" (float, Unix time the post was submitted).
+    """
+    posts = []
+    for child in data.get("data", {}).get("children", []):
+        if child.get("kind") != "t3":
+            continue
+        post = child.get("data", {})
+        post_id = post.get("name")
+        if skip is not None and skip(post_id):
+            continue
+
+        author = post.get("author")
+        if not author or author == "[deleted]":
+            continue
+
+        posts.append({
+            "post_id": post_id,
+            "title": _clean_text(post.get("title", "")),
+            "author": author,
+            "author_href": urljoin(base_url, f"/user/{author}"),
+            "selftext": _clean_text(post.get("selftext", "")),
+            "created_utc": float(post.get("created_utc") or 0),
+        })
+    return posts
+
+
+def _clean_text(text):
+    """Collapse whitespace the way a rendered element's .text would, keeping line breaks."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
@@ -0,0 +1,129 @@
+"""
+Memory budget for the browser-free worker.
+
+A small dyno kills the process (Heroku: R14/R15) once it goes far over its
+memory quota, losing whatever was in flight. MemoryBudget checks the
+worker's own RSS before every cycle instead. Past the soft limit it runs a
+full garbage collection and hands freed heap back to the OS; if the
+process is still over the budget after that, it exits cleanly (stores
+flushed and closed) so the process manager restarts it with a fresh heap.
+
+It plugs into pipeline.run() as the `health` object, like
+DriverSupervisor does for Chrome.
+"""
+import ctypes
+import ctypes.util
+import gc
+import logging
+
+from settings import get_settings
+
+log = logging.getLogger(__name__)
+
+
+def process_rss_bytes(pid="self"):
+    """Current resident memory of one process (Linux only); None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _load_libc():
+    path = ctypes.util.find_library("c")
+    if not path:
+        return None
+    try:
+        libc = ctypes.CDLL(path)
+        return libc if hasattr(libc, "malloc_trim") else None
+    except OSError:
+        return None
+
+
+_libc = _load_libc()
+
+
+def release_memory():
+    """Collect garbage and return free heap pages to the OS (glibc only)."""
+    collected = gc.collect()
+    if _libc is not None:
+        _libc.malloc_trim(0)
+    return collected
+
+
+class MemoryBudgetExceeded(SystemExit):
+    """Raised to stop the worker when it stays over budget after releasing memory."""
+
+
+class MemoryBudget:
+    """
+    Keep the worker's RSS under a fixed budget.
+
+    Args:
+        budget_mb (float): Hard limit; the worker exits above it (0 disables).
+        soft_limit (float): Fraction of the budget above which memory is released.
+        rss_reader (callable): Returns the current RSS in bytes, or None.
+    """
+
+    def __init__(self, budget_mb=512.0, soft_limit=0.8, rss_reader=process_rss_bytes):
+        self.budget_mb = budget_mb
+        self.soft_limit = soft_limit
+        self.rss_reader = rss_reader
+        self.last_rss_mb = None
+        self.peak_rss_mb = 0.0
+        self.releases = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a budget from the MEMORY_BUDGET_MB and MEMORY_SOFT_LIMIT settings."""
+        settings = get_settings()
+        return cls(settings.memory_budget_mb, settings.memory_soft_limit)
+
+    def rss_mb(self):
+        rss = self.rss_reader()
+        self.last_rss_mb = rss / 2**20 if rss is not None else None
+        if self.last_rss_mb is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb, self.last_rss_mb)
+        return self.last_rss_mb
+
+    def check(self):
+        """Release memory past the soft limit; exit if still over the budget."""
+        rss_mb = self.rss_mb()
+        if not self.budget_mb or rss_mb is None or rss_mb < self.budget_mb * self.soft_limit:
+            return
+        self.releases += 1
+        release_memory()
+        after_mb = self.rss_mb()
+        log.warning("RSS %.0f MB over %.0f%% of the %.0f MB budget; released memory, now %.0f MB",
+                    rss_mb, self.soft_limit * 100, self.budget_mb, after_mb,
+                    extra={"memory": self.stats()})
+        if after_mb >= self.budget_mb:
+            log.critical("RSS %.0f MB still over the %.0f MB budget, exiting for a restart",
+                         after_mb, self.budget_mb, extra={"memory": self.stats()})
+            raise MemoryBudgetExceeded(3)
+
+    def record_success(self):
+        pass
+
+    def record_failure(self, error=None):
+        if isinstance(error, MemoryError):
+            release_memory()
+
+    def stats(self):
+        """Current memory figures, for logging."""
+        return {
+            "rss_mb": self.last_rss_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+            "budget_mb": self.budget_mb,
+            "releases": self.releases,
+        }
+
+    def log_stats(self):
+        stats = self.stats()
+        rss = f"{stats['rss_mb']:.0f} MB" if stats["rss_mb"] is not None else "unknown"
+        log.info("Memory: %s RSS (peak %.0f MB) of a %.0f MB budget, %d release(s)",
+                 rss, stats["peak_rss_mb"], self.budget_mb, self.releases, extra={"memory": stats})
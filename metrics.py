@@ -0,0 +1,200 @@
+"""
+In-process counters and latency histograms for the monitor loop.
+
+Metrics live in module-level objects that any module can import and
+update; they cost a lock and a few additions per observation. Set
+METRICS_PORT to also serve them in the Prometheus text format on
+http://127.0.0.1:<port>/metrics (localhost only, off by default).
+
+Usage:
+    from metrics import LISTING_FETCH_SECONDS, POSTS_SEEN
+    POSTS_SEEN.inc(len(posts))
+    with LISTING_FETCH_SECONDS.time():
+        ...
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from settings import get_settings
+
+# Seconds; covers a sub-millisecond parse up to a five-minute poll sleep
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_registry = []
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + body + "}"
+
+
+class Counter:
+    """A monotonically increasing count, optionally split by labels."""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self):
+        """{label tuple: value}."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative bucketed observations (e.g. latencies), optionally split by labels."""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """{label tuple: {"count", "sum"}}."""
+        with self._lock:
+            return {key: {"count": series[-2], "sum": series[-1]} for key, series in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in series_items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+def sleep(seconds, reason):
+    """time.sleep that records the pause in SLEEP_SECONDS."""
+    SLEEP_SECONDS.observe(seconds, reason=reason)
+    time.sleep(seconds)
+
+
+def render_prometheus():
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def latency_summary(histogram):
+    """{label value(s): (count, average seconds)} for logging."""
+    summary = {}
+    for key, series in histogram.snapshot().items():
+        name = ",".join(str(value) for _, value in key) or histogram.name
+        summary[name] = (series["count"], series["sum"] / series["count"] if series["count"] else 0.0)
+    return summary
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port=None, host=None):
+    """
+    Serve /metrics from a daemon thread (port and host default to METRICS_PORT and METRICS_HOST).
+
+    Returns:
+        ThreadingHTTPServer | None: The server, or None if port is 0.
+    """
+    settings = get_settings()
+    port = settings.metrics_port if port is None else port
+    host = settings.metrics_host if host is None else host
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+POSTS_SEEN = Counter("hiring_bot_posts_seen_total", "New posts returned by listing fetches")
+POSTS_SKIPPED = Counter("hiring_bot_posts_skipped_total",
+                        "Posts skipped before classification, by reason (seen, author, prefilter)")
+CLASSIFIER_CALLS = Counter("hiring_bot_llm_calls_total", "Completed OpenAI calls, by stage")
+CACHE_HITS = Counter("hiring_bot_ai_cache_hits_total", "Classifications answered from the cache")
+CACHE_MISSES = Counter("hiring_bot_ai_cache_misses_total", "Classification cache misses")
+TOKENS_USED = Counter("hiring_bot_tokens_total",
+                      "OpenAI tokens used, by stage and kind (prompt, completion; cached is the part of prompt "
+                      "served from the prompt cache)")
+CLASSIFY_FAILURES = Counter("hiring_bot_classify_failures_total",
+                            "Posts left unclassified after all retries; not marked seen, so retried next cycle")
+PARSE_FAILURES = Counter("hiring_bot_ai_parse_failures_total", "AI replies that failed schema validation")
+LISTING_FETCH_SECONDS = Histogram("hiring_bot_listing_fetch_seconds", "Time to load the listing, by source")
+LISTING_PARSE_SECONDS = Histogram("hiring_bot_listing_parse_seconds", "Time to parse the listing HTML or JSON")
+LLM_CALL_SECONDS = Histogram("hiring_bot_llm_call_seconds", "OpenAI request latency, by stage")
+STAGE_SECONDS = Histogram("hiring_bot_stage_seconds", "Time per cycle stage (fetch, classify, act)")
+SLEEP_SECONDS = Histogram("hiring_bot_sleep_seconds", "Deliberate sleeps, by reason")
@@ -0,0 +1,256 @@
+"""
+The fetch -> dedup -> classify -> act loop shared by both entry points.
+
+Each refresh reads the listing through a `read_listing(skip)` callable,
+drops posts already seen or by already-handled authors, runs the local
+prefilter, classifies what is left with the AI, and hands each analyzed
+post to a sink. The sink is the only browser-specific piece: reddit_bot.py
+passes one that opens a chat in Chrome, reddit_bot_api.py one that writes
+leads to a file. Nothing here imports Selenium.
+
+A sink provides `handle(post, analysis, author_store)` and may provide
+`log_stats()` and `close()`.
+"""
+import logging
+import time
+
+import classifier
+import metrics
+from ai_cache import ClassificationCache
+from author_store import AuthorStore
+from poll_scheduler import AdaptiveScheduler
+from prefilter import Prefilter
+from profiling import LoopProfiler
+from seen_posts import SeenPostIndex
+import tracing
+from tracing import tracer
+
+log = logging.getLogger(__name__)
+
+
+def seen_filter(seen_posts):
+    """A `skip(fullname)` callable for listing readers that drops already-seen posts."""
+    def already_seen(fullname):
+        if fullname in seen_posts:
+            metrics.POSTS_SKIPPED.inc(reason="seen")
+            return True
+        return False
+    return already_seen
+
+
+def fetch_new_posts(read_listing, seen_posts, source):
+    """
+    Read the listing, dropping posts already in the seen index before extraction.
+
+    Returns None when the reader reports nothing new since the last poll.
+    """
+    start_ns = time.time_ns()
+    posts = read_listing(seen_filter(seen_posts))
+
+    # Each new post's trace starts with the listing read it came from
+    end_ns = time.time_ns()
+    for post in posts or []:
+        trace = tracer.start_trace(post["post_id"], "post", start_ns=start_ns,
+                                   **{"post.id": post["post_id"], "post.author": post["author"]})
+        tracer.record_span("listing.extract", trace, start_ns, end_ns,
+                           **{"listing.source": source, "listing.new_posts": len(posts)})
+    return posts
+
+
+def select_candidates(posts, author_store, seen_posts, prefilter):
+    """Drop posts by already-processed authors or rejected by the prefilter."""
+    candidates = []
+    batch_authors = set()
+    for post in posts:
+        author_name = post["author"]
+        post_id = post["post_id"]
+
+        trace = tracer.trace(post_id)
+
+        # Skip if we've already processed (or another post in this batch is theirs)
+        with trace.child("dedup") as span:
+            duplicate = author_name in author_store or author_name in batch_authors
+            span.set_attribute("dedup.duplicate", duplicate)
+        if duplicate:
+            log.info("Already processed '%s', skipping.", author_name,
+                     extra={"post_id": post_id, "author": author_name})
+            metrics.POSTS_SKIPPED.inc(reason="author")
+            seen_posts.add(post_id)
+            tracer.end_trace(post_id, **{"post.outcome": "duplicate_author"})
+            continue
+
+        # Reject obvious non-matches locally, analyze the rest with AI
+        with trace.child("prefilter") as span:
+            reject_reason = prefilter.check(post["title"], post["selftext"])
+            span.set_attribute("prefilter.reason", reject_reason or "")
+        if reject_reason:
+            log.info("Prefilter rejected post by '%s' (%s), skipping.", author_name, reject_reason,
+                     extra={"post_id": post_id, "author": author_name})
+            metrics.POSTS_SKIPPED.inc(reason="prefilter")
+            # Only the post is skipped: a local guess must not block the author's later posts
+            seen_posts.add(post_id)
+            tracer.end_trace(post_id, **{"post.outcome": "prefilter_rejected"})
+            continue
+
+        log.info("Found post by '%s': %s. Queued for AI analysis...", author_name, post["title"],
+                 extra={"post_id": post_id, "author": author_name})
+        log.debug("Text being sent to AI", extra={"post_id": post_id, "payload": classifier.post_text(post)})
+        batch_authors.add(author_name)
+        candidates.append(post)
+    return candidates
+
+
+def process_posts(posts, sink, author_store, seen_posts, ai_cache, prefilter):
+    """Dedup, classify and act on one refresh worth of new posts."""
+    try:
+        candidates = select_candidates(posts, author_store, seen_posts, prefilter)
+
+        # Classify every remaining post from this refresh concurrently,
+        # then act on them one at a time in listing order
+        with metrics.STAGE_SECONDS.time(stage="classify"):
+            analyses = classifier.classify_posts(candidates, cache=ai_cache) if candidates else []
+
+        with metrics.STAGE_SECONDS.time(stage="act"):
+            for post, analysis in zip(candidates, analyses):
+                if analysis is None:
+                    # Not recorded or marked seen, so the post is classified again next cycle
+                    log.warning("Could not classify post by '%s', retrying next cycle.", post["author"],
+                                extra={"post_id": post["post_id"], "author": post["author"]})
+                    metrics.CLASSIFY_FAILURES.inc()
+                    tracer.end_trace(post["post_id"], **{"post.outcome": "classify_failed"})
+                    continue
+                try:
+                    with tracer.trace(post["post_id"]).child("act"):
+                        sink.handle(post, analysis, author_store)
+                    seen_posts.add(post["post_id"])
+                except Exception as e:
+                    log.exception("Error processing post: %s", e, extra={"post_id": post["post_id"]})
+                    tracer.trace(post["post_id"]).record_exception(e)
+                    continue
+                finally:
+                    tracer.end_trace(post["post_id"])
+    finally:
+        # Close the traces of posts a failure left unfinished
+        for post in posts:
+            tracer.end_trace(post["post_id"])
+
+    author_store.flush()
+    seen_posts.save()
+    log_stats(sink, ai_cache, prefilter)
+
+
+def log_stats(sink, ai_cache, prefilter):
+    stats = ai_cache.stats()
+    log.info("AI cache: %d hits, %d misses (%.0f%% hit rate)",
+             stats["hits"], stats["misses"], stats["hit_rate"] * 100, extra={"ai_cache": stats})
+    log.info("Prefilter: %d rejected, %d sent to AI", prefilter.rejected, prefilter.passed)
+    ai_stats = classifier.ai_stats
+    log.info("AI replies failing schema: %d (%d retried)",
+             ai_stats["parse_failures"], ai_stats["schema_retries"], extra={"ai_stats": dict(ai_stats)})
+    for stage, usage in classifier.token_usage.items():
+        log.info("Tokens (%s): %d calls, %d prompt (%d cached), %d completion", stage,
+                 usage["calls"], usage["prompt_tokens"], usage["cached_tokens"], usage["completion_tokens"],
+                 extra={"stage": stage, "usage": dict(usage)})
+    if hasattr(sink, "log_stats"):
+        sink.log_stats()
+    stage_times = metrics.latency_summary(metrics.STAGE_SECONDS)
+    log.info("Stage latency (avg): %s",
+             ", ".join(f"{stage} {avg:.2f}s" for stage, (_, avg) in sorted(stage_times.items())),
+             extra={"stage_seconds": stage_times})
+
+
+def run_monitor_loop(read_listing, source, sink, author_store, seen_posts, ai_cache, prefilter, health=None,
+                     cursor=None):
+    """
+    Poll the listing forever.
+
+    Args:
+        read_listing: `read_listing(skip)` -> list of posts, or None if unchanged.
+        source (str): Listing source name for traces ("browser" or "json").
+        sink: Acts on each analyzed post.
+        health (DriverSupervisor | MemoryBudget, optional): Checked before each cycle and told
+            how it went.
+        cursor (ListingFetcher, optional): Its `before=` cursor is committed after each
+            successful cycle, up to the oldest post still unseen.
+    """
+    # Poll faster when posts are arriving, slower when quiet, back off on errors
+    scheduler = AdaptiveScheduler.from_env()
+    # Profiles the next cycles when PROFILE_CYCLES is set or on SIGUSR1
+    profiler = LoopProfiler.from_env()
+    while True:
+        try:
+            with profiler.cycle():
+                if health is not None:
+                    health.check()
+                log.info("Checking new posts...")
+                with metrics.STAGE_SECONDS.time(stage="fetch"):
+                    posts = fetch_new_posts(read_listing, seen_posts, source)
+                metrics.POSTS_SEEN.inc(len(posts) if posts else 0)
+                if posts is None:
+                    log.info("Listing unchanged since last check, skipping.")
+                else:
+                    log.info("Number of new posts found: %d", len(posts), extra={"new_posts": len(posts)})
+                    process_posts(posts, sink, author_store, seen_posts, ai_cache, prefilter)
+                if cursor is not None:
+                    cursor.commit_cursor(seen_posts)
+
+            delay = scheduler.record_success(len(posts) if posts else 0)
+            stats = scheduler.stats()
+            if health is not None:
+                health.record_success()
+                health.log_stats()
+            log.info("Waiting %.0fs before next check (~%.2f new posts/min)...",
+                     delay, stats["posts_per_minute"], extra={"scheduler": stats})
+            metrics.sleep(delay, "poll")
+
+        except Exception as e:
+            delay = scheduler.record_error()
+            log.exception("Error in main loop: %s", e)
+            if health is not None:
+                try:
+                    health.record_failure(e)
+                except Exception as restart_error:
+                    log.error("Could not recover from the failed cycle: %s", restart_error)
+            log.warning("Backing off %.0fs after %d consecutive error(s)...",
+                        delay, scheduler.consecutive_errors)
+            metrics.sleep(delay, "backoff")
+
+
+def run(read_listing, source, sink, health=None, cursor=None):
+    """Open the bot's stores, run the monitor loop, and close everything on the way out."""
+    # Per-post traces, if TRACE_FILE is set
+    tracing.configure()
+
+    # Authors we've already processed (both messaged and no chat)
+    author_store = AuthorStore()
+    imported = author_store.import_legacy_files()
+    if imported:
+        log.info("Imported %d authors from legacy text files.", imported)
+    log.info("Author store has %d processed authors.", len(author_store))
+
+    # Posts we've already handled, so they are skipped before any extraction
+    seen_posts = SeenPostIndex()
+    log.info("Loaded %d seen posts.", len(seen_posts))
+
+    # Classification results for duplicate post text
+    ai_cache = ClassificationCache()
+
+    # Local rules that reject obvious non-coding posts before the AI call
+    prefilter = Prefilter()
+
+    # Prometheus /metrics on localhost, if METRICS_PORT is set
+    metrics_server = metrics.start_http_server()
+    if metrics_server is not None:
+        log.info("Serving metrics on http://%s:%d/metrics", *metrics_server.server_address[:2])
+
+    try:
+        run_monitor_loop(read_listing, source, sink, author_store, seen_posts, ai_cache, prefilter, health,
+                         cursor)
+    finally:
+        if hasattr(sink, "close"):
+            sink.close()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        author_store.close()
+        seen_posts.save()
+        ai_cache.close()
@@ -0,0 +1,98 @@
+"""
+Adaptive poll interval for the monitor loop.
+
+Replaces the fixed one-minute sleep. The interval follows the observed
+arrival rate of new posts: bursts shorten it so leads are picked up
+sooner, quiet periods let it relax back to max_interval. By default that
+is the old one minute, so the bot never polls less often than it used
+to; raise POLL_MAX_SECONDS to go easier on the listing overnight. After
+errors the delay backs off exponentially with jitter.
+"""
+import random
+import time
+
+from settings import get_settings
+
+
+class AdaptiveScheduler:
+    """
+    Pick the delay before the next poll.
+
+    Call record_success(new_posts) or record_error() after each poll; both
+    return the number of seconds to sleep.
+
+    Args:
+        min_interval (float): Shortest delay between polls, in seconds.
+        max_interval (float): Longest delay between successful polls.
+        target_posts (float): New posts we aim to find per poll; the interval
+            is target_posts divided by the smoothed arrival rate.
+        smoothing (float): EWMA weight of the newest rate sample (0-1].
+        error_max_interval (float): Cap on the backoff delay after errors.
+    """
+
+    def __init__(self, min_interval=15.0, max_interval=60.0, target_posts=1.0,
+                 smoothing=0.3, error_max_interval=900.0, initial_interval=60.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_posts = target_posts
+        self.smoothing = smoothing
+        self.error_max_interval = error_max_interval
+        self.interval = min(max(initial_interval, min_interval), max_interval)
+        self.last_delay = self.interval  # the delay most recently chosen
+        self.rate = None  # smoothed new posts per second
+        self.consecutive_errors = 0
+        self._last_poll = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a scheduler from the POLL_* settings."""
+        settings = get_settings()
+        return cls(
+            min_interval=settings.poll_min_seconds,
+            max_interval=settings.poll_max_seconds,
+            target_posts=settings.poll_target_posts,
+            error_max_interval=settings.poll_error_max_seconds,
+        )
+
+    def record_success(self, new_posts):
+        """Update the arrival rate after a successful poll that found new_posts."""
+        now = time.monotonic()
+        self.consecutive_errors = 0
+        if self._last_poll is not None:
+            elapsed = max(now - self._last_poll, 1e-3)
+            sample = new_posts / elapsed
+            if self.rate is None:
+                self.rate = sample
+            else:
+                self.rate = self.smoothing * sample + (1 - self.smoothing) * self.rate
+        self._last_poll = now
+
+        if self.rate:
+            desired = self.target_posts / self.rate
+        elif self.rate is None:
+            # No arrival rate yet (first poll): keep the initial interval
+            desired = self.interval
+        else:
+            desired = self.max_interval
+        # Shrink at once for bursts, but only grow gradually when things go quiet
+        desired = min(desired, self.interval * 2)
+        self.interval = min(max(desired, self.min_interval), self.max_interval)
+        self.last_delay = self.interval
+        return self.last_delay
+
+    def record_error(self):
+        """Back off exponentially, with jitter, after a failed poll."""
+        self.consecutive_errors += 1
+        ceiling = min(self.error_max_interval,
+                      max(self.interval, self.min_interval) * 2 ** (self.consecutive_errors - 1))
+        self.last_delay = random.uniform(ceiling / 2, ceiling)
+        return self.last_delay
+
+    def stats(self):
+        """Current scheduling state, for logging and metrics."""
+        return {
+            "delay_seconds": self.last_delay,
+            "interval_seconds": self.interval,
+            "posts_per_minute": (self.rate or 0.0) * 60,
+            "consecutive_errors": self.consecutive_errors,
+        }
@@ -0,0 +1,168 @@
+"""
+Cheap local pre-filter that runs ahead of the OpenAI classifier.
+
+Most posts on the job multireddit are [For Hire] offers, video editing,
+design and other non-programming work. Those are rejected here with title
+tag rules and a small keyword scorer; only posts that might be a coding
+gig are sent to the model. The keyword scorer only rejects posts without
+a single coding term: "[Hiring] Build a video editing app" is full of
+negative words and still a coding job.
+
+Stages are plain callables taking (title, selftext) and returning a
+rejection reason string, or None to let the post through, so new rules
+can be plugged in without touching the loop.
+"""
+import math
+import re
+from collections import Counter
+
+# Title tags that are never someone hiring, e.g. "[For Hire]", "(Offer)"
+REJECT_TITLE_TAGS = {
+    "for hire", "forhire", "offer", "offering", "meta", "discussion",
+    "question", "promo", "available", "showcase",
+}
+
+# Terms suggesting the post needs code written
+POSITIVE_KEYWORDS = {
+    "developer": 2.0, "programmer": 2.0, "coder": 2.0, "engineer": 1.5,
+    "code": 1.5, "coding": 1.5, "script": 1.5, "scraper": 1.5, "scrape": 1.5,
+    "automate": 1.5, "automation": 1.5, "bot": 1.5, "api": 1.5, "backend": 1.5,
+    "frontend": 1.5, "fullstack": 1.5, "app": 1.0, "website": 1.0, "web": 0.5,
+    "software": 1.5, "bug": 1.0, "extension": 1.0, "database": 1.0, "sql": 1.5,
+    "etl": 1.5, "python": 2.0, "javascript": 2.0, "typescript": 2.0, "react": 2.0,
+    "node": 1.5, "nodejs": 2.0, "django": 2.0, "flask": 2.0, "nextjs": 2.0,
+    "flutter": 2.0, "swift": 2.0, "kotlin": 2.0, "ios": 1.5, "android": 1.5,
+    "wordpress": 1.0, "shopify": 1.0, "woocommerce": 1.0, "aws": 1.0, "java": 1.5,
+    "rust": 1.5, "golang": 1.5, "php": 1.5, "js": 1.5, "excel": 0.5, "discord": 0.5,
+}
+
+# Terms for the kinds of work the classifier prompt tells the model to reject
+NEGATIVE_KEYWORDS = {
+    "video": 2.0, "editor": 1.5, "editing": 2.0, "edit": 1.0, "designer": 2.0,
+    "design": 1.0, "logo": 2.0, "brand": 1.0, "graphic": 2.0, "illustrator": 2.0,
+    "animation": 2.0, "motion": 1.0, "writer": 2.0, "writing": 1.5, "article": 1.5,
+    "articles": 1.5, "content": 1.0, "copywriter": 2.0, "translator": 2.0,
+    "translate": 2.0, "transcribe": 2.0, "transcription": 2.0, "voiceover": 2.0,
+    "bookkeeper": 2.0, "bookkeeping": 2.0, "assistant": 1.5, "va": 1.5,
+    "social": 1.0, "instagram": 1.0, "tiktok": 1.0, "youtube": 1.0, "reels": 1.5,
+    "resume": 1.5, "tutor": 1.5, "marketing": 1.0, "photographer": 2.0,
+}
+
+TITLE_TAG_RE = re.compile(r"^\s*[\[\(]([^\]\)]{1,30})[\]\)]")
+TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*")
+
+
+class TitleTagRule:
+    """Reject posts whose leading title tag marks them as not hiring."""
+
+    def __init__(self, reject_tags=REJECT_TITLE_TAGS):
+        self.reject_tags = {tag.casefold() for tag in reject_tags}
+
+    def __call__(self, title, selftext):
+        match = TITLE_TAG_RE.match(title)
+        if match:
+            tag = " ".join(match.group(1).casefold().split())
+            if tag in self.reject_tags:
+                return f"title tag [{tag}]"
+        return None
+
+
+class KeywordScorer:
+    """
+    Score a post with weighted keywords and sublinear term frequency.
+
+    Each matched keyword contributes weight * (1 + log(tf)). A post is
+    rejected only if no positive keyword matched and its negative score is
+    at least reject_margin: negative words never outweigh a coding term.
+    Anything else is left for the model.
+    """
+
+    def __init__(self, positive=POSITIVE_KEYWORDS, negative=NEGATIVE_KEYWORDS,
+                 reject_margin=1.5, title_boost=2.0):
+        self.positive = positive
+        self.negative = negative
+        self.reject_margin = reject_margin
+        self.title_boost = title_boost
+
+    def scores(self, title, selftext):
+        """(positive, negative) keyword scores."""
+        counts = Counter(tokenize(selftext))
+        for token in tokenize(title):
+            counts[token] += self.title_boost
+        positive = sum(w * (1 + math.log(counts[t])) for t, w in self.positive.items() if counts[t] >= 1)
+        negative = sum(w * (1 + math.log(counts[t])) for t, w in self.negative.items() if counts[t] >= 1)
+        return positive, negative
+
+    def score(self, title, selftext):
+        positive, negative = self.scores(title, selftext)
+        return positive - negative
+
+    def __call__(self, title, selftext):
+        positive, negative = self.scores(title, selftext)
+        if positive == 0 and negative >= self.reject_margin:
+            return f"keyword score {-negative:.1f}"
+        return None
+
+
+class Prefilter:
+    """
+    Run stages in order; the first one that returns a reason rejects the post.
+
+    Args:
+        stages (list[callable]): Each takes (title, selftext) and returns a
+            rejection reason or None.
+    """
+
+    def __init__(self, stages=None):
+        self.stages = stages if stages is not None else [TitleTagRule(), KeywordScorer()]
+        self.rejected = 0
+        self.passed = 0
+
+    def check(self, title, selftext):
+        """Return a rejection reason, or None if the post should go to the model."""
+        for stage in self.stages:
+            reason = stage(title, selftext)
+            if reason:
+                self.rejected += 1
+                return reason
+        self.passed += 1
+        return None
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.casefold())
+
+
+def evaluate(prefilter, labelled_posts):
+    """
+    Measure a prefilter against posts labelled with "is_hiring_post".
+
+    "Rejected" is treated as a prediction of not-hiring, so precision is the
+    share of rejected posts that really were not hiring, and recall is the
+    share of non-hiring posts that were rejected (model calls saved).
+
+    Returns:
+        dict: precision, recall, leads_lost, calls_saved and the lost posts.
+    """
+    true_rejects = false_rejects = missed_rejects = 0
+    lost = []
+    for post in labelled_posts:
+        reason = prefilter.check(post["title"], post.get("selftext", ""))
+        if reason and not post["is_hiring_post"]:
+            true_rejects += 1
+        elif reason:
+            false_rejects += 1
+            lost.append((post["title"], reason))
+        elif not post["is_hiring_post"]:
+            missed_rejects += 1
+
+    rejected = true_rejects + false_rejects
+    not_hiring = true_rejects + missed_rejects
+    return {
+        "precision": true_rejects / rejected if rejected else 1.0,
+        "recall": true_rejects / not_hiring if not_hiring else 1.0,
+        "leads_lost": false_rejects,
+        "calls_saved": rejected,
+        "total": len(labelled_posts),
+        "lost_posts": lost,
+    }
@@ -0,0 +1,228 @@
+"""
+On-demand profiling of monitor loop cycles.
+
+Off by default. When armed, the next N cycles are profiled and the result
+is written to PROFILE_DIR as a timestamped raw profile plus a text summary
+of the top functions. Arm it with either:
+
+    PROFILE_CYCLES=5 python reddit_bot.py     # the first 5 cycles after start
+    kill -USR1 <pid>                          # the next PROFILE_SIGNAL_CYCLES cycles
+
+PROFILE_MODE picks the profiler:
+    cprofile - deterministic, every Python call (the .prof file opens in
+               snakeviz / pstats). Adds noticeable overhead while running.
+    sample   - a background thread samples the loop's stack every
+               PROFILE_SAMPLE_INTERVAL seconds; low overhead, and time spent
+               blocked in WebDriver or OpenAI calls shows up under the
+               calling line. Writes collapsed stacks for flamegraph tools.
+
+Only the cycles themselves are profiled: the profiler is paused on the
+way out of each cycle and resumed on the way into the next, so the poll
+sleep between them is not in the profile or the reported time.
+
+While disarmed, LoopProfiler.cycle() is one attribute check per cycle.
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+from settings import get_settings
+
+log = logging.getLogger(__name__)
+
+PROFILE_TOP = 30
+
+
+class LoopProfiler:
+    """
+    Profile a run of loop cycles on request.
+
+    Wrap each cycle's work in `with profiler.cycle():`.
+
+    Args:
+        mode (str): "cprofile" or "sample".
+        output_dir (str): Where the profile and summary files go.
+        signal_cycles (int): Cycles profiled after SIGUSR1.
+        sample_interval (float): Seconds between stack samples in "sample" mode.
+    """
+
+    def __init__(self, mode="cprofile", output_dir="profiles", signal_cycles=5, sample_interval=0.01):
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown PROFILE_MODE {mode!r}, expected 'cprofile' or 'sample'")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.signal_cycles = signal_cycles
+        self.sample_interval = sample_interval
+        self.armed = 0       # cycles still to profile
+        self._session = None  # the profiler, between the first and last armed cycle (paused between cycles)
+        self._profiled = 0
+        self._profiled_seconds = 0.0  # in-cycle wall time
+        self._cycle_started_at = None
+
+    @classmethod
+    def from_env(cls):
+        """Build a profiler from the PROFILE_* settings and listen for SIGUSR1."""
+        settings = get_settings()
+        profiler = cls(settings.profile_mode, settings.profile_dir, settings.profile_signal_cycles,
+                       settings.profile_sample_interval)
+        if settings.profile_cycles > 0:
+            profiler.arm(settings.profile_cycles)
+        profiler.install_signal_handler()
+        return profiler
+
+    def arm(self, cycles):
+        """Profile the next `cycles` cycles (extends a run already in progress)."""
+        self.armed = max(self.armed, cycles)
+        log.info("Profiling the next %d loop cycle(s) (%s)", self.armed, self.mode)
+
+    def install_signal_handler(self, signum=getattr(signal, "SIGUSR1", None)):
+        """Arm on `signum`; a no-op where the signal doesn't exist or off the main thread."""
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return
+        signal.signal(signum, lambda *_: self.arm(self.signal_cycles))
+
+    def cycle(self):
+        return self
+
+    def __enter__(self):
+        if self.armed:
+            if self._session is None:
+                self._start()
+            else:
+                self._resume()
+            self._cycle_started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._session is None:
+            return False
+        self._pause()
+        self._profiled_seconds += time.perf_counter() - self._cycle_started_at
+        self.armed -= 1
+        self._profiled += 1
+        if self.armed <= 0:
+            self._finish()
+        return False
+
+    def _start(self):
+        self._profiled = 0
+        self._profiled_seconds = 0.0
+        if self.mode == "cprofile":
+            self._session = cProfile.Profile()
+            self._session.enable()
+        else:
+            self._session = StackSampler(threading.get_ident(), self.sample_interval)
+            self._session.start()
+
+    def _pause(self):
+        if self.mode == "cprofile":
+            self._session.disable()
+        else:
+            self._session.pause()
+
+    def _resume(self):
+        if self.mode == "cprofile":
+            self._session.enable()
+        else:
+            self._session.resume()
+
+    def _finish(self):
+        session, self._session = self._session, None
+        self.armed = 0
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"loop-{time.strftime('%Y%m%d-%H%M%S')}-{self.mode}")
+        header = (f"{self._profiled} cycle(s), {self._profiled_seconds:.2f}s wall time in cycles "
+                  f"(sleeps between cycles excluded), mode {self.mode}\n\n")
+
+        if self.mode == "cprofile":
+            session.dump_stats(base + ".prof")
+            summary = header + cprofile_summary(session)
+            raw_path = base + ".prof"
+        else:
+            session.stop()
+            raw_path = base + ".folded"
+            with open(raw_path, "w", encoding="utf-8") as f:
+                for stack, count in session.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            summary = header + session.summary()
+
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(summary)
+        log.info("Profile of %d cycle(s) written to %s (summary in %s)", self._profiled, raw_path, base + ".txt")
+
+
+def cprofile_summary(profile, top=PROFILE_TOP):
+    """Top functions by cumulative and by own time."""
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.strip_dirs()
+    out.write(f"Top {top} by cumulative time\n")
+    stats.sort_stats("cumulative").print_stats(top)
+    out.write(f"\nTop {top} by own time\n")
+    stats.sort_stats("tottime").print_stats(top)
+    return out.getvalue()
+
+
+class StackSampler:
+    """Periodically sample one thread's Python stack from a background thread; pause() skips samples."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        self.stacks = Counter()     # "outer;...;inner" -> samples
+        self.own = Counter()        # innermost frame -> samples
+        self.inclusive = Counter()  # any frame on the stack -> samples
+        self._stop = threading.Event()
+        self._active = threading.Event()
+        self._active.set()
+        self._thread = threading.Thread(target=self._run, name="loop-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def pause(self):
+        self._active.clear()
+
+    def resume(self):
+        self._active.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._active.is_set():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            names.reverse()
+            self.samples += 1
+            self.stacks[";".join(names)] += 1
+            self.own[names[-1]] += 1
+            for name in set(names):
+                self.inclusive[name] += 1
+
+    def summary(self, top=PROFILE_TOP):
+        if not self.samples:
+            return "No samples collected.\n"
+        lines = [f"{self.samples} samples every {self.interval * 1000:.0f} ms", "",
+                 f"Top {top} by inclusive samples (on the stack)"]
+        lines += [f"{count / self.samples:7.1%}  {name}" for name, count in self.inclusive.most_common(top)]
+        lines += ["", f"Top {top} by own samples (innermost frame)"]
+        lines += [f"{count / self.samples:7.1%}  {name}" for name, count in self.own.most_common(top)]
+        return "\n".join(lines) + "\n"
@@ -5,69 +5,29 @@ def send_simple_chat_message(driver, message):
     time.sleep(20)
     driver.switch_to.active_element.send_keys(message)
     driver.switch_to.active_element.send_keys(Keys.ENTER)
-    print("Message sent!")
-import os
+    log.info("Message sent!")
 import random
+import sys
 import time
-import json
-from selenium import webdriver
+import logging
+# Settings are parsed on the first get_settings() call, inside the ConfigError guard below
+from settings import ConfigError, get_settings, openai_client
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-from openai import OpenAI
-
-MESSAGED_FILE = "messaged_authors.txt"
-NO_CHAT_FILE = "no_chat_authors.txt"
-
-# Load environment variables if .env file exists
-if os.path.exists('.env'):
-    with open('.env', 'r') as f:
-        for line in f:
-            if line.strip() and not line.startswith('#'):
-                key, value = line.strip().split('=', 1)
-                os.environ[key] = value
-
-# Initialize OpenAI client
-# Make sure to set your OpenAI API key: export OPENAI_API_KEY="your-api-key-here"
-# Or run setup_openai.py to set it up
-try:
-    client = OpenAI()
-except Exception as e:
-    print(f"Error initializing OpenAI client: {e}")
-    print("Make sure your OPENAI_API_KEY is set. Run setup_openai.py to configure it.")
-    exit(1)
-
-# A list of alternative openers for fallback cases
-openers = [
-    "Hey, your post caught my eye because I've got some relevant experience. Want to see if we're on the same page?",
-    "I've got some thoughts on how I might help. Care to discuss for a minute?",
-    "Hello! I noticed your post and I'm excited about the role. Can you share more details?",
-    "Hey! I believe I can bring something unique to your project. Can we chat about the specifics?",
-    "Hey just read your post. Do you mind if I ask a few questions?"
-]
-
-def load_processed_authors():
-    """Load a set of processed authors from both messaged and no-chat files."""
-    authors_set = set()
-    for filename in [MESSAGED_FILE, NO_CHAT_FILE]:
-        if os.path.exists(filename):
-            with open(filename, "r", encoding="utf-8") as f:
-                for line in f:
-                    username = line.strip()
-                    if username:
-                        authors_set.add(username)
-    return authors_set
-
-def append_author_to_file(username):
-    """Append a single username to the messaged file."""
-    with open(MESSAGED_FILE, "a", encoding="utf-8") as f:
-        f.write(username + "\n")
-
-def append_no_chat_author_to_file(username):
-    """Append a single username to the no chat file."""
-    with open(NO_CHAT_FILE, "a", encoding="utf-8") as f:
-        f.write(username + "\n")
+from selenium.common.exceptions import TimeoutException
+from author_store import OUTCOME_MESSAGED, OUTCOME_NO_CHAT
+from listing_parser import parse_listing
+from listing_fetcher import ListingFetcher, LISTING_URL
+from classifier import generate_message, post_text
+from driver_supervisor import DriverSupervisor
+from bot_logging import setup_logging
+import metrics
+import pipeline
+from tracing import tracer
+
+log = logging.getLogger("reddit_bot")
 
 def type_like_human(element, text, wpm=70):
     """
@@ -83,231 +43,175 @@ def type_like_human(element, text, wpm=70):
     for char in text:
         element.send_keys(char)
         # Add slight random variation to mimic natural typing variability.
-        time.sleep(delay * random.uniform(0.8, 1.2))
+        metrics.sleep(delay * random.uniform(0.8, 1.2), "typing")
 
 
-def analyze_post_with_ai(full_post_text: str) -> dict:
-    """
-    Use OpenAI to analyze if a post is software development related and generate a response.
-    
-    Returns:
-        dict: {
-            "is_hiring_post": bool,
-            "message": str
-        }
-    """
-    try:
-        prompt = f"""
-        Is this post someone HIRING a SOFTWARE DEVELOPER/PROGRAMMER for coding work? 
-
-        Post: "{full_post_text}"
+# Seconds spent waiting per page-load step: step -> count/total/max/timeouts
+wait_stats = {}
 
-        ONLY respond if they need someone to WRITE CODE, build software, create apps, or do programming work.
-        Do NOT respond to:
-        - Video editors, graphic designers, content creators
-        - People offering services or selling products
-        - General tech discussions or non-coding jobs
-        - Any non-programming work
+def monitor_job_posts():
+    settings = get_settings()
+    # Images, fonts and media are blocked unless BLOCK_RESOURCES=off.
+    # The supervisor restarts Chrome if it hangs, bloats or keeps failing;
+    # the signed-in profile is on disk, so a fresh session stays logged in.
+    supervisor = DriverSupervisor.from_env()
+    driver = supervisor.driver
+
+    # Continue as soon as old.reddit shows a logged-in session
+    log.info("Chrome launched. You have %.0f seconds to sign in if needed...", settings.sign_in_timeout)
+    driver.get("https://old.reddit.com/")
+    if wait_for(driver, "sign_in", EC.presence_of_element_located((By.CSS_SELECTOR, "body.loggedin")),
+                settings.sign_in_timeout) is None:
+        log.warning("No logged-in session detected, continuing anyway.")
+
+    # "browser" renders the listing in Chrome; "json" reads the .json listing over HTTP
+    if settings.listing_source == "json":
+        fetcher = ListingFetcher()
+        read_listing = fetcher.fetch
+    else:
+        fetcher = None
+        read_listing = lambda skip: read_browser_listing(supervisor.driver, skip)
 
-        IMPORTANT: If this is a hiring post for coding work, your message MUST:
-        - Be 2-3 sentences max
-        - Sound casual, creative, and original - GRAB THEIR ATTENTION!
-        - Be funny, sassy, and cool - sound like a boss who knows their shit
-        - Show you understood what they're looking for (briefly mention the project/tech)
-        - Write in first person (I/me) as a confident freelance developer
-        - If it's app development (mobile apps): mention "vastcom.us"
-        - If it's other software development: mention "nofeelance.com"
-        
-        Examples of good messages:
-        "React e-commerce? Been there, crushed that. I live and breathe JSX - check out my playground at nofeelance.com"
-        "Mobile apps are my jam! I've launched more iOS/Android apps than I can count. Peep my work at vastcom.us"
-        "Python automation is literally my superpower. I make scripts so smooth they practically write themselves - nofeelance.com"
-        
-        If NOT hiring for programming/coding: return empty message
+    try:
+        pipeline.run(read_listing, settings.listing_source, ChatSink(supervisor), health=supervisor,
+                     cursor=fetcher)
+    finally:
+        supervisor.close()
+        if fetcher is not None:
+            fetcher.close()
+
+def read_browser_listing(driver, skip):
+    """Render the listing in Chrome and parse it, skipping posts for which skip(fullname) is true."""
+    with metrics.LISTING_FETCH_SECONDS.time(source="browser"):
+        driver.get(LISTING_URL)
+        wait_for(driver, "listing_page", EC.presence_of_element_located((By.ID, "siteTable")))
+        # One page_source read instead of several WebDriver calls per post
+        page_source = driver.page_source
+    with metrics.LISTING_PARSE_SECONDS.time(format="html"):
+        return parse_listing(page_source, skip=skip)
+
+def wait_for(driver, step, condition, timeout=None):
+    """
+    Wait until a page-load condition holds instead of sleeping a fixed time.
 
-        {{
-            "is_hiring_post": true/false,
-            "message": "your response OR empty string"
-        }}
-        """
-        
-        response = client.chat.completions.create(
-            model=os.environ.get("OPENAI_MODEL"),
-            messages=[
-                {"role": "system", "content": "You are a confident, badass freelance developer who knows their craft inside out. Be creative, funny, sassy, and cool. GRAB ATTENTION with your personality while showing you're the expert they need. Sound like a boss, not a corporate drone."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=1,
-            max_completion_tokens=3000
-        )
-        
-        # Parse the JSON response
-        response_content = response.choices[0].message.content
-        print(f"Raw AI response: {response_content}")
-        
-        # Strip markdown code blocks if present
-        if response_content.strip().startswith("```json"):
-            response_content = response_content.strip()
-            response_content = response_content.replace("```json", "").replace("```", "").strip()
-        elif response_content.strip().startswith("```"):
-            response_content = response_content.strip()
-            response_content = response_content.replace("```", "").strip()
-        
-        try:
-            result = json.loads(response_content)
-            return result
-        except json.JSONDecodeError as json_err:
-            print(f"JSON parsing error: {json_err}")
-            print(f"Response was not valid JSON: {response_content}")
-            return {
-                "is_hiring_post": False,
-                "message": ""
-            }
-        
-    except Exception as e:
-        print(f"Error with AI analysis: {e}")
-        print(f"Full error details: {type(e).__name__}: {str(e)}")
-        # Fallback
-        return {
-            "is_hiring_post": False,
-            "message": ""
-        }
+    The time spent is recorded per step in wait_stats. The timeout defaults
+    to PAGE_LOAD_TIMEOUT, the max seconds for a read-only page to be ready.
 
-def get_message_for_post(full_post_text: str) -> str:
-    """
-    Use AI to analyze the post and generate an appropriate response.
+    Returns:
+        The condition's value, or None if it timed out.
     """
-    analysis = analyze_post_with_ai(full_post_text)
-    
-    if analysis["is_hiring_post"]:
-        print(f"AI identified as hiring post")
-        return analysis["message"]
+    timeout = get_settings().page_load_timeout if timeout is None else timeout
+    start = time.perf_counter()
+    stats = wait_stats.setdefault(step, {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+    try:
+        return WebDriverWait(driver, timeout).until(condition)
+    except TimeoutException:
+        stats["timeouts"] += 1
+        log.warning("Timed out after %.0fs waiting for %s", timeout, step, extra={"step": step})
+        return None
+    finally:
+        elapsed = time.perf_counter() - start
+        stats["count"] += 1
+        stats["total"] += elapsed
+        stats["max"] = max(stats["max"], elapsed)
+
+def handle_post(driver, post, analysis, author_store):
+    """Act on an analyzed post: message the author if it's a hiring post and chat is available."""
+    author_name = post["author"]
+    post_id = post["post_id"]
+    trace = tracer.trace(post_id)
+
+    if not analysis["is_hiring_post"]:
+        log.info("Not a hiring post for '%s', skipping.", author_name,
+                 extra={"post_id": post_id, "author": author_name})
+        author_store.record(author_name, OUTCOME_NO_CHAT, post_id)
+        trace.set_attribute("post.outcome", "not_hiring")
+        return
+
+    log.info("AI confirmed hiring post by '%s'. Checking for chat...", author_name,
+             extra={"post_id": post_id, "author": author_name})
+
+    with tracer.span("webdriver.profile_page", **{"url.full": post["author_href"]}):
+        driver.get(post["author_href"])
+        # The profile sidebar holds the chat link; missing for suspended/deleted users
+        wait_for(driver, "profile_page", EC.presence_of_element_located((By.CSS_SELECTOR, ".side .titlebox")))
+
+        # Check for chat button
+        chat_buttons = driver.find_elements(By.XPATH, "//a[@data-message-type='navigate.chat']")
+    if chat_buttons:
+        log.info("Chat option available for '%s', sending message...", author_name,
+                 extra={"post_id": post_id, "author": author_name})
+        with tracer.span("webdriver.chat") as chat_span:
+            chat_button = chat_buttons[0]
+            chat_button.click()
+            metrics.sleep(3, "chat_open")
+
+            try:
+                # Switch to chat iframe
+                iframe = WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, "iframe.pinned-to-bottom.chat-app-window.regular")
+                    )
+                )
+                driver.switch_to.frame(iframe)
+                metrics.sleep(5, "chat_iframe")
+
+                # Stage 2: only now, with a chat window open, write the message
+                selected_message = analysis["message"] or generate_message(post_text(post))
+
+                # Type out the message in a "human-like" way
+                active_element = driver.switch_to.active_element
+                type_like_human(active_element, selected_message)
+                active_element.send_keys(Keys.ENTER)
+
+                # Switch back out of iframe
+                driver.switch_to.default_content()
+
+                author_store.record(author_name, OUTCOME_MESSAGED, post_id)
+                trace.set_attribute("post.outcome", "messaged")
+            except Exception as e:
+                log.error("Error processing chat for '%s': %s", author_name, e,
+                          extra={"post_id": post_id, "author": author_name})
+                chat_span.record_exception(e)
+                author_store.record(author_name, OUTCOME_MESSAGED, post_id)
+                trace.set_attribute("post.outcome", "chat_error")
     else:
-        print(f"Not a hiring post")
-        return ""
-
-def monitor_job_posts():
-    chrome_options = webdriver.ChromeOptions()
-    chrome_options.add_argument("--user-data-dir=/home/shadow-crack/reddit_bot_chrome_profile")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        log.info("No chat option available for '%s', marking as no chat.", author_name,
+                 extra={"post_id": post_id, "author": author_name})
+        author_store.record(author_name, OUTCOME_NO_CHAT, post_id)
+        trace.set_attribute("post.outcome", "no_chat")
 
-    driver = webdriver.Chrome(options=chrome_options)
+        metrics.sleep(2, "no_chat")
 
-    print("Chrome launched. You have 5 seconds to sign in if needed...")
-    time.sleep(10)
+class ChatSink:
+    """Pipeline sink that messages hiring-post authors through Reddit chat in Chrome."""
 
-    # Load authors we've already processed (both messaged and no chat)
-    processed_authors = load_processed_authors()
-    print(f"Loaded {len(processed_authors)} processed authors from files.")
+    def __init__(self, supervisor):
+        self.supervisor = supervisor
 
-    while True:
+    def handle(self, post, analysis, author_store):
         try:
-            driver.get('https://old.reddit.com/user/gemini_caroline/m/job/new/')
-            time.sleep(3)
-
-            print("Checking new posts...")
-            posts = driver.find_elements(By.CLASS_NAME, "thing")
-            print("Number of posts found:", len(posts))
-
-            for post in posts:
-                try:
-                    title_element = post.find_element(By.CLASS_NAME, "title")
-                    title = title_element.text.strip()
-
-                    author_elem = post.find_element(By.CLASS_NAME, "author")
-                    author_name = author_elem.text.strip()
-
-                    # Attempt to extract the self-text of the post
-                    try:
-                        body_element = post.find_element(By.CSS_SELECTOR, ".usertext-body")
-                        body_text = body_element.text.strip()
-                    except:
-                        body_text = ""
-
-                    # Combine title + body
-                    full_post_text = f"{title} {body_text}".strip()
-
-                    # Skip if we've already processed
-                    if author_name in processed_authors:
-                        print(f"Already processed '{author_name}', skipping.")
-                        continue
-
-                    # Analyze ALL posts with AI
-                    print(f"Found post by '{author_name}'. Analyzing with AI...")
-                    print(f"Post title: {title}")
-                    print(f"Post body: {body_text[:200]}{'...' if len(body_text) > 200 else ''}")
-                    print(f"Full text being sent to AI: {full_post_text[:300]}{'...' if len(full_post_text) > 300 else ''}")
-                    
-                    analysis = analyze_post_with_ai(full_post_text)
-                    
-                    if not analysis["is_hiring_post"]:
-                        print(f"Not a hiring post for '{author_name}', skipping.")
-                        processed_authors.add(author_name)
-                        append_no_chat_author_to_file(author_name)
-                        continue
-                    
-                    print(f"AI confirmed hiring post by '{author_name}'. Checking for chat...")
-
-                    author_url = author_elem.get_attribute("href")
-                    driver.get(author_url)
-                    time.sleep(2)
-                    
-                    # Check for chat button
-                    chat_buttons = driver.find_elements(By.XPATH, "//a[@data-message-type='navigate.chat']")
-                    if chat_buttons:
-                        print(f"Chat option available for '{author_name}', sending message...")
-                        chat_button = chat_buttons[0]
-                        chat_button.click()
-                        time.sleep(3)
-                        
-                        try:
-                            # Switch to chat iframe
-                            iframe = WebDriverWait(driver, 15).until(
-                                EC.presence_of_element_located(
-                                    (By.CSS_SELECTOR, "iframe.pinned-to-bottom.chat-app-window.regular")
-                                )
-                            )
-                            driver.switch_to.frame(iframe)
-                            time.sleep(5)
-                            
-                            # Use the message from AI analysis
-                            selected_message = analysis["message"]
-
-                            # Type out the message in a "human-like" way
-                            active_element = driver.switch_to.active_element
-                            type_like_human(active_element, selected_message)
-                            active_element.send_keys(Keys.ENTER)
-
-                            # Switch back out of iframe
-                            driver.switch_to.default_content()
-
-                            processed_authors.add(author_name)
-                            append_author_to_file(author_name)
-                        except Exception as e:
-                            print(f"Error processing chat for '{author_name}': {e}")
-                            processed_authors.add(author_name)
-                            append_author_to_file(author_name)
-                    else:
-                        print(f"No chat option available for '{author_name}', marking as no chat.")
-                        processed_authors.add(author_name)
-                        append_no_chat_author_to_file(author_name)
-                        
-                        time.sleep(2)
-                except Exception as e:
-                    print(f"Error processing post: {e}")
-                    continue
-
-            print("Waiting 1 minute before next check...")
-            time.sleep(60)
-
+            handle_post(self.supervisor.driver, post, analysis, author_store)
         except Exception as e:
-            print(f"Error in main loop: {e}")
-            time.sleep(60)
+            # process_posts moves on to the next post; let the supervisor count browser failures
+            self.supervisor.record_failure(e)
+            raise
+
+    def log_stats(self):
+        for step, stats in wait_stats.items():
+            log.info("Page wait (%s): %d waits, avg %.2fs, max %.2fs, %d timeouts", step,
+                     stats["count"], stats["total"] / stats["count"], stats["max"], stats["timeouts"],
+                     extra={"step": step, "wait": dict(stats)})
 
 if __name__ == "__main__":
     try:
+        # Validate every setting, then fail at startup, not on the first post, if the API key is missing
+        get_settings()
+        setup_logging()
+        openai_client()
         monitor_job_posts()
+    except ConfigError as e:
+        log.error("Configuration error: %s", e)
+        sys.exit(1)
     except KeyboardInterrupt:
-        print("\nStopping monitor...")
\ No newline at end of file
+        log.info("Stopping monitor...")
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Persistent index of listing posts the bot has already handled.
+
+Keyed by the `data-fullname` of each `.thing` (e.g. "t3_1igm8qm") so a post
+can be skipped before any of its text is extracted or sent to the model.
+The index is bounded in size, evicts entries by age, and is saved to
+processed_posts.json so a restart does not redo the whole page.
+"""
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+SEEN_POSTS_FILE = "processed_posts.json"
+
+# Listing pages only show the newest ~25 posts, so a week of history is plenty
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_AGE = 7 * 24 * 60 * 60
+
+
+class SeenPostIndex:
+    """
+    Bounded, age-evicting set of post fullnames.
+
+    Args:
+        path (str): JSON file the index is loaded from and saved to.
+        max_entries (int): Oldest entries are dropped beyond this size.
+        max_age (float): Entries older than this many seconds are dropped.
+    """
+
+    def __init__(self, path=SEEN_POSTS_FILE, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_age=DEFAULT_MAX_AGE):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._seen = OrderedDict()  # fullname -> first seen timestamp, oldest first
+        self._dirty = False
+        self.load()
+
+    def load(self):
+        """Load the index from disk, accepting the old list-of-ids format."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                log.warning("Ignoring unreadable seen-post file %s: %s", self.path, e)
+                return
+
+        if isinstance(data, list):
+            # Legacy format: bare post ids without the "t3_" kind prefix
+            now = time.time()
+            entries = [(_to_fullname(post_id), now) for post_id in data]
+            self._dirty = True
+        else:
+            entries = sorted(data.items(), key=lambda item: item[1])
+
+        self._seen = OrderedDict(entries)
+        self.evict()
+
+    def save(self):
+        """Write the index to disk atomically if it changed."""
+        if not self._dirty:
+            return
+        self.evict()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._seen, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def __contains__(self, fullname):
+        return fullname in self._seen
+
+    def __len__(self):
+        return len(self._seen)
+
+    def add(self, fullname):
+        """Mark a post as handled."""
+        if fullname in self._seen:
+            return
+        self._seen[fullname] = time.time()
+        self._dirty = True
+        if len(self._seen) > self.max_entries:
+            self.evict()
+
+    def evict(self):
+        """Drop entries past max_age, then the oldest ones beyond max_entries."""
+        cutoff = time.time() - self.max_age
+        while self._seen:
+            fullname, seen_at = next(iter(self._seen.items()))
+            if seen_at >= cutoff and len(self._seen) <= self.max_entries:
+                break
+            self._seen.popitem(last=False)
+            self._dirty = True
+
+
+def _to_fullname(post_id):
+    return post_id if post_id.startswith("t3_") else f"t3_{post_id}"
@@ -0,0 +1,244 @@
+"""
+Bot configuration, loaded and validated once.
+
+Importing this module copies `.env` into the environment (variables that
+are already set win). Every setting the bot uses is parsed here, on the
+first get_settings() call; other modules call it when they start working
+(inside functions and from_env() constructors), never at import. The
+entry points call it first inside their `except ConfigError` block, so a
+missing model or a value like METRICS_PORT=abc exits with one line naming
+the variable instead of a traceback. Nothing expensive happens at import
+either: the OpenAI SDK is only imported, and its client built, on the
+first call to openai_client().
+
+Usage:
+    from settings import get_settings, openai_client
+    settings = get_settings()
+    openai_client().chat.completions.create(model=settings.classifier_model, ...)
+"""
+import functools
+import os
+from dataclasses import dataclass
+
+ENV_FILE = ".env"
+
+LISTING_SOURCES = ("browser", "json")
+
+
+class ConfigError(ValueError):
+    """A setting is missing or invalid."""
+
+
+def load_env_file(path=ENV_FILE, override=False):
+    """
+    Copy KEY=value lines from an env file into os.environ.
+
+    Blank lines and # comments are skipped; surrounding quotes are stripped.
+
+    Returns:
+        int: Number of variables set.
+    """
+    if not os.path.exists(path):
+        return 0
+    count = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, value = line.split("=", 1)
+            key, value = key.strip(), value.strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+                value = value[1:-1]
+            if override or key not in os.environ:
+                os.environ[key] = value
+                count += 1
+    return count
+
+
+def _setting(environ, name, default, parse=str, check=None, expected=""):
+    raw = environ.get(name, "")
+    if raw == "":
+        value = default
+    else:
+        try:
+            value = parse(raw)
+        except ValueError:
+            raise ConfigError(f"{name}={raw!r} is not a valid {parse.__name__.lstrip('_')}") from None
+    if check is not None and value is not None and not check(value):
+        raise ConfigError(f"{name}={value!r}: expected {expected}")
+    return value
+
+
+def _flag(raw):
+    """On/off switch: 1/true/yes/on or 0/false/no/off, in any case."""
+    value = raw.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(raw)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Validated settings for every part of the bot; read them here, not from os.environ."""
+
+    # Stage 1: cheap yes/no classification, run for every post
+    classifier_model: str
+    classifier_temperature: float
+    classifier_max_tokens: int  # per post; a batch gets this times its size
+    # Stage 2: creative message generation, run only for hiring posts we can message
+    message_model: str
+    message_temperature: float
+    message_max_tokens: int
+    # Concurrent classification
+    ai_batch_size: int  # posts per batched request; 1 disables batching
+    ai_concurrency: int  # concurrent OpenAI requests per listing refresh
+    ai_request_timeout: float  # seconds before one OpenAI request is abandoned
+    ai_max_retries: int  # retries after a 429, timeout or connection error
+    # Listing and browser
+    listing_source: str  # "browser" renders the listing in Chrome; "json" reads the .json listing
+    reddit_user_agent: str  # User-Agent for .json listing requests
+    page_load_timeout: float  # max seconds to wait for a read-only page to be ready
+    sign_in_timeout: float  # max seconds to wait at startup for a logged-in session
+    chrome_profile_dir: str
+    block_resources: str  # "cdp", "prefs" or "off"
+    page_load_strategy: str  # "normal", "eager" or "none"
+    # Chrome health checks (0 disables the RSS and age limits)
+    driver_max_rss_mb: float
+    driver_max_failures: int
+    driver_max_age_hours: float
+    driver_ping_timeout: float
+    # Adaptive polling, in seconds
+    poll_min_seconds: float
+    poll_max_seconds: float
+    poll_target_posts: float
+    poll_error_max_seconds: float
+    # Logging (an empty log_file logs to the console only)
+    log_file: str
+    log_level: str
+    log_max_bytes: int
+    log_backup_count: int
+    log_rotate_hours: float
+    log_payload_sample_rate: float
+    log_console: bool
+    # Metrics, profiling, tracing and traffic recording (empty paths / port 0 turn them off)
+    metrics_port: int
+    metrics_host: str
+    profile_cycles: int
+    profile_signal_cycles: int
+    profile_mode: str  # "cprofile" or "sample"
+    profile_dir: str
+    profile_sample_interval: float
+    trace_file: str
+    traffic_log: str
+    traffic_log_max_bytes: int
+    traffic_log_backup_count: int
+    # Outputs of the browser-free bot and worker
+    leads_file: str
+    memory_budget_mb: float  # 0 disables the budget
+    memory_soft_limit: float  # fraction of the budget above which memory is released
+    cold_start_grace_seconds: float  # on fresh state, how far back before start posts are still handled
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        openai_model = environ.get("OPENAI_MODEL") or None
+        classifier_model = environ.get("CLASSIFIER_MODEL") or openai_model
+        message_model = environ.get("MESSAGE_MODEL") or openai_model
+        if not classifier_model or not message_model:
+            raise ConfigError("No model configured: set OPENAI_MODEL (or both CLASSIFIER_MODEL and MESSAGE_MODEL)")
+        positive = (lambda v: v > 0, "a value above 0")
+        non_negative = (lambda v: v >= 0, "0 or more")
+        temperature = (lambda v: 0 <= v <= 2, "a temperature between 0 and 2")
+        fraction = (lambda v: 0 <= v <= 1, "a fraction between 0 and 1")
+
+        def one_of(*choices):
+            return lambda v: v in choices, " or ".join(choices)
+
+        settings = cls(
+            classifier_model=classifier_model,
+            classifier_temperature=_setting(environ, "CLASSIFIER_TEMPERATURE", 0.0, float, *temperature),
+            classifier_max_tokens=_setting(environ, "CLASSIFIER_MAX_TOKENS", 100, int, *positive),
+            message_model=message_model,
+            message_temperature=_setting(environ, "MESSAGE_TEMPERATURE", 1.0, float, *temperature),
+            message_max_tokens=_setting(environ, "MESSAGE_MAX_TOKENS", 400, int, *positive),
+            ai_batch_size=_setting(environ, "AI_BATCH_SIZE", 8, int, *positive),
+            ai_concurrency=_setting(environ, "AI_CONCURRENCY", 4, int, *positive),
+            ai_request_timeout=_setting(environ, "AI_REQUEST_TIMEOUT", 60.0, float, *positive),
+            ai_max_retries=_setting(environ, "AI_MAX_RETRIES", 3, int, *non_negative),
+            listing_source=_setting(environ, "LISTING_SOURCE", "browser", str, *one_of(*LISTING_SOURCES)),
+            reddit_user_agent=_setting(environ, "REDDIT_USER_AGENT", "HiringBot/1.0"),
+            page_load_timeout=_setting(environ, "PAGE_LOAD_TIMEOUT", 15.0, float, *positive),
+            sign_in_timeout=_setting(environ, "SIGN_IN_TIMEOUT", 10.0, float, *non_negative),
+            chrome_profile_dir=environ.get("CHROME_PROFILE_DIR", "/home/shadow-crack/reddit_bot_chrome_profile"),
+            block_resources=_setting(environ, "BLOCK_RESOURCES", "cdp", str, *one_of("cdp", "prefs", "off")),
+            page_load_strategy=_setting(environ, "PAGE_LOAD_STRATEGY", "eager", str,
+                                        *one_of("normal", "eager", "none")),
+            driver_max_rss_mb=_setting(environ, "DRIVER_MAX_RSS_MB", 1500.0, float, *non_negative),
+            driver_max_failures=_setting(environ, "DRIVER_MAX_FAILURES", 3, int, *positive),
+            driver_max_age_hours=_setting(environ, "DRIVER_MAX_AGE_HOURS", 24.0, float, *non_negative),
+            driver_ping_timeout=_setting(environ, "DRIVER_PING_TIMEOUT", 10.0, float, *positive),
+            poll_min_seconds=_setting(environ, "POLL_MIN_SECONDS", 15.0, float, *positive),
+            poll_max_seconds=_setting(environ, "POLL_MAX_SECONDS", 60.0, float, *positive),
+            poll_target_posts=_setting(environ, "POLL_TARGET_POSTS", 1.0, float, *positive),
+            poll_error_max_seconds=_setting(environ, "POLL_ERROR_MAX_SECONDS", 900.0, float, *positive),
+            # An empty LOG_FILE, TRACE_FILE or TRAFFIC_LOG means off, so only a missing one gets the default
+            log_file=environ.get("LOG_FILE", "hiring_dm_bot.log"),
+            log_level=_setting(environ, "LOG_LEVEL", "INFO", str.upper,
+                               *one_of("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")),
+            log_max_bytes=_setting(environ, "LOG_MAX_BYTES", 10 * 1024 * 1024, int, *non_negative),
+            log_backup_count=_setting(environ, "LOG_BACKUP_COUNT", 7, int, *non_negative),
+            log_rotate_hours=_setting(environ, "LOG_ROTATE_HOURS", 24.0, float, *non_negative),
+            log_payload_sample_rate=_setting(environ, "LOG_PAYLOAD_SAMPLE_RATE", 1.0, float, *fraction),
+            log_console=_setting(environ, "LOG_CONSOLE", True, _flag),
+            metrics_port=_setting(environ, "METRICS_PORT", 0, int, lambda v: 0 <= v <= 65535, "a port number"),
+            metrics_host=_setting(environ, "METRICS_HOST", "127.0.0.1"),
+            profile_cycles=_setting(environ, "PROFILE_CYCLES", 0, int, *non_negative),
+            profile_signal_cycles=_setting(environ, "PROFILE_SIGNAL_CYCLES", 5, int, *positive),
+            profile_mode=_setting(environ, "PROFILE_MODE", "cprofile", str, *one_of("cprofile", "sample")),
+            profile_dir=_setting(environ, "PROFILE_DIR", "profiles"),
+            profile_sample_interval=_setting(environ, "PROFILE_SAMPLE_INTERVAL", 0.01, float, *positive),
+            trace_file=environ.get("TRACE_FILE", ""),
+            traffic_log=environ.get("TRAFFIC_LOG", "classifier_traffic.jsonl.gz"),
+            traffic_log_max_bytes=_setting(environ, "TRAFFIC_LOG_MAX_BYTES", 64 * 1024 * 1024, int, *non_negative),
+            traffic_log_backup_count=_setting(environ, "TRAFFIC_LOG_BACKUP_COUNT", 10, int, *non_negative),
+            leads_file=_setting(environ, "LEADS_FILE", "hiring_leads.jsonl"),
+            memory_budget_mb=_setting(environ, "MEMORY_BUDGET_MB", 512.0, float, *non_negative),
+            memory_soft_limit=_setting(environ, "MEMORY_SOFT_LIMIT", 0.8, float, *fraction),
+            cold_start_grace_seconds=_setting(environ, "COLD_START_GRACE_SECONDS", 300.0, float, *non_negative),
+        )
+        # Checks across settings; each value above is already valid on its own
+        if settings.poll_min_seconds > settings.poll_max_seconds:
+            raise ConfigError(f"POLL_MIN_SECONDS={settings.poll_min_seconds:g} is above "
+                              f"POLL_MAX_SECONDS={settings.poll_max_seconds:g}")
+        return settings
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings():
+    """The process-wide Settings, parsed from the environment on first call."""
+    return Settings.from_env()
+
+
+@functools.lru_cache(maxsize=None)
+def openai_client():
+    """The shared synchronous OpenAI client, built on first use."""
+    from openai import OpenAI, OpenAIError
+
+    try:
+        return OpenAI()
+    except OpenAIError as e:
+        raise ConfigError(f"Could not create the OpenAI client ({e}). "
+                          "Set OPENAI_API_KEY or run setup_openai.py to configure it.") from e
+
+
+def async_openai_client(**kwargs):
+    """A new AsyncOpenAI client; its connection pool belongs to the running event loop."""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(**kwargs)
+
+
+load_env_file()
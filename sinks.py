@@ -0,0 +1,71 @@
+"""
+Sinks that act on analyzed posts without a browser.
+
+The Chrome chat sink lives in reddit_bot.py with the rest of the Selenium
+code; sinks here only need the classifier and the author store, so the
+API-only bot can run without importing Selenium.
+"""
+import json
+import logging
+import sys
+import time
+
+import classifier
+from author_store import OUTCOME_LEAD, OUTCOME_NO_CHAT
+from settings import get_settings
+from tracing import tracer
+
+log = logging.getLogger(__name__)
+
+
+class LeadFileSink:
+    """
+    Append each hiring post, with a drafted message, to a JSON-lines file.
+
+    Args:
+        path (str): Leads file; one JSON object per line (default: LEADS_FILE).
+            "-" writes the leads to stdout instead, for platforms that keep
+            stdout (a Heroku log drain) but not the local disk.
+    """
+
+    def __init__(self, path=None):
+        self.path = get_settings().leads_file if path is None else path
+        self.leads = 0
+        self._file = sys.stdout if self.path == "-" else open(self.path, "a", encoding="utf-8")
+
+    def handle(self, post, analysis, author_store):
+        author_name = post["author"]
+        post_id = post["post_id"]
+        trace = tracer.trace(post_id)
+
+        if not analysis["is_hiring_post"]:
+            log.info("Not a hiring post for '%s', skipping.", author_name,
+                     extra={"post_id": post_id, "author": author_name})
+            author_store.record(author_name, OUTCOME_NO_CHAT, post_id)
+            trace.set_attribute("post.outcome", "not_hiring")
+            return
+
+        message = analysis["message"] or classifier.generate_message(classifier.post_text(post))
+        lead = {
+            "post_id": post_id,
+            "author": author_name,
+            "title": post["title"],
+            "author_href": post["author_href"],
+            "url": f"https://old.reddit.com/comments/{post_id.removeprefix('t3_')}",
+            "message": message,
+            "timestamp": time.time(),
+        }
+        self._file.write(json.dumps(lead, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.leads += 1
+        log.info("Saved lead for '%s' to %s", author_name, self.path,
+                 extra={"post_id": post_id, "author": author_name})
+        author_store.record(author_name, OUTCOME_LEAD, post_id)
+        trace.set_attribute("post.outcome", "lead")
+
+    def log_stats(self):
+        log.info("Leads saved: %d", self.leads, extra={"leads": self.leads})
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
@@ -0,0 +1,59 @@
+from ai_cache import ClassificationCache, cache_key
+
+HIRING = {"is_hiring_post": True, "message": ""}
+
+
+def test_hit_after_put(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "state.sqlite3"))
+    assert cache.get("Need a React dev", "model", "v1") is None
+    cache.put("Need a React dev", "model", "v1", HIRING)
+
+    assert cache.get("Need a React dev", "model", "v1") == HIRING
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    cache.close()
+
+
+def test_key_normalizes_text_but_not_model_or_prompt():
+    assert cache_key("Need a  React\ndev", "m", "v1") == cache_key("need a react dev", "m", "v1")
+    assert cache_key("need a react dev", "m", "v1") != cache_key("need a react dev", "m", "v2")
+    assert cache_key("need a react dev", "m", "v1") != cache_key("need a react dev", "other", "v1")
+
+
+def test_entries_expire_after_ttl(tmp_path, fake_clock):
+    cache = ClassificationCache(str(tmp_path / "state.sqlite3"), ttl=60)
+    cache.put("post", "model", "v1", HIRING)
+
+    fake_clock.now += 59
+    assert cache.get("post", "model", "v1") == HIRING
+    fake_clock.now += 2
+    assert cache.get("post", "model", "v1") is None
+    # The expired entry is gone, not just skipped
+    assert cache.conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0] == 0
+    cache.close()
+
+
+def test_least_recently_used_evicted_past_max_entries(tmp_path, fake_clock):
+    cache = ClassificationCache(str(tmp_path / "state.sqlite3"), max_entries=2)
+    cache.put("first", "model", "v1", HIRING)
+    fake_clock.now += 1
+    cache.put("second", "model", "v1", HIRING)
+    fake_clock.now += 1
+    cache.get("first", "model", "v1")  # now more recently used than "second"
+    fake_clock.now += 1
+    cache.put("third", "model", "v1", HIRING)
+
+    assert cache.get("first", "model", "v1") == HIRING
+    assert cache.get("second", "model", "v1") is None
+    assert cache.get("third", "model", "v1") == HIRING
+    cache.close()
+
+
+def test_survives_reopen(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    cache = ClassificationCache(path)
+    cache.put("post", "model", "v1", HIRING)
+    cache.close()
+
+    reopened = ClassificationCache(path)
+    assert reopened.get("post", "model", "v1") == HIRING
+    reopened.close()
@@ -0,0 +1,86 @@
+import sqlite3
+
+from author_store import AuthorStore, OUTCOME_LEAD, OUTCOME_MESSAGED, OUTCOME_NO_CHAT
+
+
+def committed(path, username):
+    """Read an author straight from the database, bypassing the store's pending writes."""
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT outcome, post_id FROM authors WHERE username = ?", (username,)).fetchone()
+    finally:
+        conn.close()
+
+
+def test_no_chat_is_batched(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    store = AuthorStore(path, batch_size=20, flush_interval=3600)
+    store.record("alice", OUTCOME_NO_CHAT, "t3_a")
+
+    assert "alice" in store
+    assert store.get("alice")[:2] == (OUTCOME_NO_CHAT, "t3_a")
+    assert committed(path, "alice") is None
+
+    store.flush()
+    assert committed(path, "alice") == (OUTCOME_NO_CHAT, "t3_a")
+    store.close()
+
+
+def test_outcomes_with_side_effects_are_committed_immediately(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    store = AuthorStore(path, batch_size=20, flush_interval=3600)
+    store.record("bob", OUTCOME_MESSAGED, "t3_b")
+    store.record("carol", OUTCOME_LEAD, "t3_c")
+
+    # Visible to another connection without a flush or close, as after a hard kill
+    assert committed(path, "bob") == (OUTCOME_MESSAGED, "t3_b")
+    assert committed(path, "carol") == (OUTCOME_LEAD, "t3_c")
+    store.close()
+
+
+def test_batch_commits_when_full(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    store = AuthorStore(path, batch_size=3, flush_interval=3600)
+    for name in ("a", "b", "c"):
+        store.record(name, OUTCOME_NO_CHAT)
+
+    assert committed(path, "c") == (OUTCOME_NO_CHAT, None)
+    assert len(store) == 3
+    store.close()
+
+
+def test_len_counts_pending_authors_once(tmp_path):
+    store = AuthorStore(str(tmp_path / "state.sqlite3"), batch_size=20, flush_interval=3600)
+    store.record("dave", OUTCOME_NO_CHAT)
+    store.flush()
+    store.record("dave", OUTCOME_NO_CHAT)  # re-recorded, still pending
+    store.record("erin", OUTCOME_NO_CHAT)
+
+    assert len(store) == 2
+    store.close()
+
+
+def test_legacy_import_runs_once(tmp_path):
+    messaged = tmp_path / "messaged_authors.txt"
+    no_chat = tmp_path / "no_chat_authors.txt"
+    messaged.write_text("alice\nbob\n\n", encoding="utf-8")
+    no_chat.write_text("carol\nalice\n", encoding="utf-8")
+    files = {OUTCOME_MESSAGED: str(messaged), OUTCOME_NO_CHAT: str(no_chat)}
+
+    store = AuthorStore(str(tmp_path / "state.sqlite3"))
+    # alice is in both files; the first outcome imported wins
+    assert store.import_legacy_files(files) == 3
+    assert store.get("alice")[0] == OUTCOME_MESSAGED
+    assert store.get("carol")[0] == OUTCOME_NO_CHAT
+
+    no_chat.write_text("carol\nfrank\n", encoding="utf-8")
+    assert store.import_legacy_files(files) == 0
+    assert "frank" not in store
+    store.close()
+
+
+def test_legacy_import_skips_missing_files(tmp_path):
+    store = AuthorStore(str(tmp_path / "state.sqlite3"))
+    assert store.import_legacy_files({OUTCOME_MESSAGED: str(tmp_path / "missing.txt")}) == 0
+    assert len(store) == 0
+    store.close()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import classifier
+from ai_cache import ClassificationCache
+from classifier import SchemaError, parse_batch_results
+
+
+def completion(content):
+    message = SimpleNamespace(content=content, refusal=None)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+
+class FakeAsyncClient:
+    """Answers chat.completions.create() with `answer(request kwargs)` -> reply content."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.requests = []
+        self.chat = SimpleNamespace(completions=self)
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return completion(self.answer(kwargs))
+
+
+def is_batch(request):
+    return request["response_format"]["json_schema"]["name"].startswith("batch")
+
+
+def batch_ids(request):
+    return [post["id"] for post in json.loads(request["messages"][-1]["content"])]
+
+
+def make_posts(*titles):
+    return [{"post_id": f"t3_{i}", "title": title, "selftext": "", "author": f"user{i}", "author_href": ""}
+            for i, title in enumerate(titles)]
+
+
+def classify(posts, client, batch_size=8):
+    return asyncio.run(classifier.classify_posts_async(posts, batch_size=batch_size, concurrency=2,
+                                                       aclient=client))
+
+
+def test_batch_results_are_mapped_back_by_id():
+    posts = make_posts("a", "b")
+    reply = completion(json.dumps({"results": [
+        {"id": "t3_1", "is_hiring_post": False},
+        {"id": "t3_0", "is_hiring_post": True},
+        {"id": "t3_99", "is_hiring_post": True},  # not in the batch
+    ]}))
+
+    assert parse_batch_results(reply, posts) == {
+        "t3_0": {"is_hiring_post": True, "message": ""},
+        "t3_1": {"is_hiring_post": False, "message": ""},
+    }
+
+
+def test_bad_batch_reply_is_a_schema_error():
+    with pytest.raises(SchemaError):
+        parse_batch_results(completion(json.dumps({"answers": []})), make_posts("a"))
+    with pytest.raises(SchemaError):
+        parse_batch_results(completion("not json"), make_posts("a"))
+
+
+def test_posts_missing_from_batch_reply_fall_back_to_single_calls(fake_settings):
+    posts = make_posts("Need a Python dev", "Logo design", "React app")
+
+    def answer(request):
+        if is_batch(request):
+            # The model skipped t3_2
+            return json.dumps({"results": [{"id": "t3_0", "is_hiring_post": True},
+                                           {"id": "t3_1", "is_hiring_post": False}]})
+        return json.dumps({"is_hiring_post": True})
+    client = FakeAsyncClient(answer)
+
+    results = classify(posts, client)
+
+    assert [result["is_hiring_post"] for result in results] == [True, False, True]
+    assert [is_batch(request) for request in client.requests] == [True, False]
+    assert "React app" in client.requests[1]["messages"][-1]["content"]
+
+
+def test_failed_batch_falls_back_to_single_calls_in_listing_order(fake_settings):
+    posts = make_posts("first", "second", "third")
+
+    def answer(request):
+        if is_batch(request):
+            return "{not json"
+        return json.dumps({"is_hiring_post": "second" in request["messages"][-1]["content"]})
+    client = FakeAsyncClient(answer)
+
+    results = classify(posts, client)
+
+    assert [result["is_hiring_post"] for result in results] == [False, True, False]
+    assert sum(not is_batch(request) for request in client.requests) == 3
+
+
+def test_schema_failure_after_retry_is_none_and_not_cached(fake_settings, tmp_path):
+    posts = make_posts("Need a scraper")
+    client = FakeAsyncClient(lambda request: json.dumps({"hiring": "maybe"}))
+    cache = ClassificationCache(str(tmp_path / "state.sqlite3"))
+
+    results = asyncio.run(classifier.classify_posts_async(posts, cache=cache, aclient=client))
+
+    assert results == [None]
+    assert len(client.requests) == 2  # the first reply and its one retry
+    assert cache.get("Need a scraper", fake_settings.classifier_model, classifier.PROMPT_VERSION) is None
+    cache.close()
+
+
+def test_schema_failure_is_retried_once(fake_settings):
+    replies = iter(["{truncated", json.dumps({"is_hiring_post": True})])
+    client = FakeAsyncClient(lambda request: next(replies))
+
+    assert classify(make_posts("Need a scraper"), client) == [{"is_hiring_post": True, "message": ""}]
@@ -0,0 +1,163 @@
+import httpx
+
+import classifier
+import pipeline
+from ai_cache import ClassificationCache
+from author_store import AuthorStore
+from listing_fetcher import ListingFetcher
+from prefilter import Prefilter
+from seen_posts import SeenPostIndex
+
+
+def child(name, author="someone", title="[Hiring] Python developer for a Django API", created_utc=1_000_000.0):
+    return {"kind": "t3", "data": {"name": name, "author": author, "title": title, "selftext": "",
+                                   "created_utc": created_utc}}
+
+
+class FakeListing:
+    """A `.json` listing endpoint for httpx.MockTransport that honours `before=` and ETags."""
+
+    def __init__(self, *children):
+        self.children = list(children)  # newest first
+        self.requests = []
+
+    def add(self, new_child):
+        self.children.insert(0, new_child)
+
+    def etag(self, children):
+        return '"' + ",".join(c["data"]["name"] for c in children) + '"'
+
+    def __call__(self, request):
+        self.requests.append(request)
+        before = request.url.params.get("before")
+        children = self.children
+        if before is not None:
+            names = [c["data"]["name"] for c in children]
+            children = children[:names.index(before)] if before in names else []
+        etag = self.etag(children)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(200, json={"data": {"children": children}}, headers={"ETag": etag})
+
+
+def fetcher_for(listing, **kwargs):
+    return ListingFetcher(client=httpx.Client(transport=httpx.MockTransport(listing)), **kwargs)
+
+
+def test_cursor_moves_only_on_commit(tmp_path):
+    listing = FakeListing(child("t3_b"), child("t3_a"))
+    fetcher = fetcher_for(listing)
+    seen = SeenPostIndex(str(tmp_path / "seen.json"))
+
+    assert [post["post_id"] for post in fetcher.fetch()] == ["t3_b", "t3_a"]
+    assert fetcher.newest_fullname is None
+
+    seen.add("t3_a")
+    seen.add("t3_b")
+    fetcher.commit_cursor(seen)
+    assert fetcher.newest_fullname == "t3_b"
+
+    listing.add(child("t3_c"))
+    assert [post["post_id"] for post in fetcher.fetch()] == ["t3_c"]
+    assert listing.requests[-1].url.params["before"] == "t3_b"
+
+
+def test_unseen_post_is_fetched_again(tmp_path):
+    listing = FakeListing(child("t3_b"), child("t3_a"))
+    fetcher = fetcher_for(listing)
+    seen = SeenPostIndex(str(tmp_path / "seen.json"))
+
+    fetcher.fetch()
+    seen.add("t3_a")  # t3_b was left unseen, e.g. its classification failed
+    fetcher.commit_cursor(seen)
+
+    # Just past t3_a, not past t3_b, and not a 304 for the unchanged listing
+    assert [post["post_id"] for post in fetcher.fetch()] == ["t3_b"]
+    assert listing.requests[-1].url.params["before"] == "t3_a"
+    assert fetcher.not_modified == 0
+
+
+def test_cursor_stops_past_oldest_unseen_post(tmp_path):
+    listing = FakeListing(child("t3_d"), child("t3_c"), child("t3_b"), child("t3_a"))
+    fetcher = fetcher_for(listing)
+    seen = SeenPostIndex(str(tmp_path / "seen.json"))
+
+    fetcher.fetch()
+    for name in ("t3_d", "t3_b", "t3_a"):
+        seen.add(name)
+    fetcher.commit_cursor(seen)
+
+    assert fetcher.newest_fullname == "t3_b"
+    assert [post["post_id"] for post in fetcher.fetch(skip=seen.__contains__)] == ["t3_c"]
+
+
+def test_uncommitted_response_is_fetched_again():
+    listing = FakeListing(child("t3_a"))
+    fetcher = fetcher_for(listing)
+
+    fetcher.fetch()  # the cycle fails before commit_cursor()
+    assert [post["post_id"] for post in fetcher.fetch()] == ["t3_a"]
+    assert "If-None-Match" not in listing.requests[-1].headers
+
+
+def test_unchanged_listing_is_a_304(tmp_path):
+    listing = FakeListing(child("t3_a"))
+    fetcher = fetcher_for(listing, full_refresh_every=0)
+    seen = SeenPostIndex(str(tmp_path / "seen.json"))
+
+    fetcher.fetch()
+    seen.add("t3_a")
+    fetcher.commit_cursor(seen)
+
+    assert fetcher.fetch() == []  # first request with the new cursor
+    fetcher.commit_cursor(seen)
+    assert fetcher.fetch() is None
+    assert fetcher.not_modified == 1
+    assert listing.requests[-1].headers["If-None-Match"] == '""'
+    assert fetcher.newest_fullname == "t3_a"
+
+
+def test_skipped_and_too_old_posts_do_not_hold_the_cursor(tmp_path):
+    listing = FakeListing(child("t3_c", created_utc=2000.0), child("t3_b", author="[deleted]"),
+                          child("t3_a", created_utc=500.0))
+    fetcher = fetcher_for(listing, not_before=1000.0)
+    seen = SeenPostIndex(str(tmp_path / "seen.json"))
+
+    assert [post["post_id"] for post in fetcher.fetch()] == ["t3_c"]
+    seen.add("t3_c")
+    fetcher.commit_cursor(seen)
+    assert fetcher.newest_fullname == "t3_c"
+
+
+class RecordingSink:
+    def __init__(self):
+        self.handled = []
+
+    def handle(self, post, analysis, author_store):
+        self.handled.append(post["post_id"])
+
+
+def test_failed_classification_is_retried_next_poll(tmp_path, monkeypatch):
+    listing = FakeListing(child("t3_b", author="bob"), child("t3_a", author="alice"))
+    fetcher = fetcher_for(listing)
+    seen = SeenPostIndex(str(tmp_path / "seen.json"))
+    author_store = AuthorStore(str(tmp_path / "state.sqlite3"))
+    ai_cache = ClassificationCache(str(tmp_path / "state.sqlite3"))
+    sink = RecordingSink()
+
+    def classify_posts(posts, cache=None):
+        # t3_b fails on the first try only
+        failing = len(sink.handled) == 0
+        return [None if failing and post["post_id"] == "t3_b" else {"is_hiring_post": True, "message": ""}
+                for post in posts]
+    monkeypatch.setattr(classifier, "classify_posts", classify_posts)
+
+    for _ in range(2):
+        posts = pipeline.fetch_new_posts(fetcher.fetch, seen, "json")
+        pipeline.process_posts(posts, sink, author_store, seen, ai_cache, Prefilter())
+        fetcher.commit_cursor(seen)
+
+    assert sink.handled == ["t3_a", "t3_b"]
+    assert "t3_b" in seen
+    author_store.close()
+    ai_cache.close()
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from poll_scheduler import AdaptiveScheduler
+
+
+@pytest.fixture
+def clock(fake_clock, monkeypatch):
+    monkeypatch.setattr(time, "monotonic", fake_clock.time)
+    return fake_clock
+
+
+def poll(scheduler, clock, new_posts):
+    """Sleep the chosen delay, then report a poll that found new_posts."""
+    clock.now += scheduler.last_delay
+    return scheduler.record_success(new_posts)
+
+
+def test_first_poll_keeps_initial_interval_within_bounds(clock):
+    assert AdaptiveScheduler(min_interval=15, max_interval=60).record_success(5) == 60
+    assert AdaptiveScheduler(min_interval=15, max_interval=60, initial_interval=600).interval == 60
+    assert AdaptiveScheduler(min_interval=15, max_interval=60, initial_interval=1).interval == 15
+
+
+def test_burst_never_goes_below_min_interval(clock):
+    scheduler = AdaptiveScheduler(min_interval=15, max_interval=60)
+    scheduler.record_success(0)
+    for _ in range(5):
+        delay = poll(scheduler, clock, 50)
+    assert delay == 15
+
+
+def test_quiet_listing_relaxes_to_max_interval_gradually(clock):
+    scheduler = AdaptiveScheduler(min_interval=15, max_interval=60)
+    scheduler.record_success(0)
+    for _ in range(3):
+        poll(scheduler, clock, 50)
+    assert scheduler.interval == 15
+
+    delays = [15] + [poll(scheduler, clock, 0) for _ in range(30)]
+    # Never shorter than the last delay, at most double it, and never past max_interval
+    assert all(before <= after <= before * 2 for before, after in zip(delays, delays[1:]))
+    assert delays[-1] == 60
+
+
+def test_error_backoff_is_capped_and_reset_by_success(clock, monkeypatch):
+    monkeypatch.setattr("random.uniform", lambda low, high: high)
+    scheduler = AdaptiveScheduler(min_interval=15, max_interval=60, error_max_interval=300)
+
+    delays = [scheduler.record_error() for _ in range(5)]
+    assert delays == [60, 120, 240, 300, 300]
+
+    poll(scheduler, clock, 0)
+    assert scheduler.consecutive_errors == 0
+    assert scheduler.record_error() == 60
@@ -0,0 +1,40 @@
+from author_store import AuthorStore
+from pipeline import select_candidates
+from prefilter import KeywordScorer, Prefilter, TitleTagRule
+from seen_posts import SeenPostIndex
+
+
+def test_coding_jobs_with_negative_words_pass():
+    scorer = KeywordScorer()
+    assert scorer("[Hiring] Need someone to build a video editing app", "") is None
+    assert scorer("[Hiring] Build a logo generator web app",
+                  "Users type their brand name, pick a style and get logo designs they can download.") is None
+
+
+def test_posts_without_coding_terms_are_rejected():
+    scorer = KeywordScorer()
+    assert scorer("[Hiring] Video editor for weekly YouTube content", "Cuts, captions and motion graphics.")
+    assert scorer("[Hiring] Cold caller for real estate leads", "") is None  # nothing to go on either way
+
+
+def test_title_tag_rule():
+    rule = TitleTagRule()
+    assert rule("[For Hire] Full stack developer available", "") == "title tag [for hire]"
+    assert rule("( Offer ) Logo design", "") == "title tag [offer]"
+    assert rule("[Hiring] Python developer", "") is None
+
+
+def test_prefilter_rejection_skips_the_post_not_the_author(tmp_path):
+    author_store = AuthorStore(str(tmp_path / "state.sqlite3"))
+    seen = SeenPostIndex(str(tmp_path / "seen.json"))
+    posts = [
+        {"post_id": "t3_a", "author": "alice", "title": "[Hiring] Podcast editor", "selftext": ""},
+        {"post_id": "t3_b", "author": "bob", "title": "[Hiring] Django developer", "selftext": ""},
+    ]
+
+    candidates = select_candidates(posts, author_store, seen, Prefilter())
+
+    assert [post["post_id"] for post in candidates] == ["t3_b"]
+    assert "t3_a" in seen
+    assert "alice" not in author_store
+    author_store.close()
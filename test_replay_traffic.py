@@ -0,0 +1,46 @@
+import json
+import os
+import sys
+
+import classifier
+import traffic_log
+from benchmarks import replay_traffic
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from listing_parser import parse_listing_json
+from settings import openai_client
+
+LISTING = os.path.join(os.path.dirname(__file__), "benchmarks", "fixtures", "old_reddit_job_new.json")
+
+
+def slow_batches(body):
+    # Batches answer after the single-post request, so they are logged out of listing order
+    schema = body["response_format"]["json_schema"]["name"] if body.get("response_format") else ""
+    return None, None, 0.3 if schema.startswith("batch") else 0.0
+
+
+def test_unchanged_replay_matches_every_request(tmp_path, monkeypatch, capsys, fake_settings):
+    with open(LISTING, "r", encoding="utf-8") as f:
+        posts = parse_listing_json(json.load(f))
+    assert len(posts) == 25
+    log_path = str(tmp_path / "traffic.jsonl.gz")
+
+    with FakeOpenAIServer(0.0, 0.0, responder=slow_batches) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        traffic_log.recorder = traffic_log.TrafficRecorder(log_path)
+        classifier.classify_posts(posts, batch_size=8, concurrency=4)
+        classifier.generate_message(classifier.post_text(posts[0]))
+        traffic_log.recorder.close()
+        traffic_log.recorder = None
+
+    entries = list(traffic_log.read_traffic(log_path))
+    assert len(entries) == 5
+    # The last post's single request finished first
+    assert [post["index"] for post in entries[0]["posts"]] == [24]
+    assert len({entry["refresh"] for entry in entries if entry["stage"] == "classify"}) == 1
+
+    openai_client.cache_clear()
+    monkeypatch.setattr(sys, "argv", ["replay_traffic", log_path, "--speed", "0"])
+    replay_traffic.main()
+
+    output = capsys.readouterr().out
+    assert "Stand-in server: 5 identical to a recorded request, 0 changed" in output
@@ -0,0 +1,69 @@
+import json
+
+from seen_posts import SeenPostIndex
+
+
+def test_add_save_and_reload(tmp_path):
+    path = str(tmp_path / "seen.json")
+    index = SeenPostIndex(path)
+    index.add("t3_a")
+    index.add("t3_b")
+    index.save()
+
+    reloaded = SeenPostIndex(path)
+    assert "t3_a" in reloaded and "t3_b" in reloaded
+    assert len(reloaded) == 2
+
+
+def test_oldest_entries_evicted_past_max_entries(tmp_path, fake_clock):
+    index = SeenPostIndex(str(tmp_path / "seen.json"), max_entries=3)
+    for name in ("t3_a", "t3_b", "t3_c", "t3_d"):
+        fake_clock.now += 1
+        index.add(name)
+
+    assert len(index) == 3
+    assert "t3_a" not in index
+    assert "t3_d" in index
+
+
+def test_entries_evicted_by_age(tmp_path, fake_clock):
+    path = str(tmp_path / "seen.json")
+    index = SeenPostIndex(path, max_age=60)
+    index.add("t3_old")
+    fake_clock.now += 50
+    index.add("t3_new")
+    fake_clock.now += 20
+    index.save()
+
+    assert "t3_old" not in index
+    assert "t3_new" in index
+    assert list(json.loads(open(path, encoding="utf-8").read())) == ["t3_new"]
+
+
+def test_readding_keeps_first_seen_time(tmp_path, fake_clock):
+    index = SeenPostIndex(str(tmp_path / "seen.json"), max_age=60)
+    index.add("t3_a")
+    fake_clock.now += 50
+    index.add("t3_a")
+    fake_clock.now += 20
+    index.evict()
+
+    assert "t3_a" not in index
+
+
+def test_legacy_list_format_is_converted(tmp_path):
+    path = tmp_path / "seen.json"
+    path.write_text(json.dumps(["1igm8qm", "t3_1ign000"]), encoding="utf-8")
+
+    index = SeenPostIndex(str(path))
+    assert "t3_1igm8qm" in index and "t3_1ign000" in index
+
+    index.save()
+    assert isinstance(json.loads(path.read_text(encoding="utf-8")), dict)
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+    path = tmp_path / "seen.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert len(SeenPostIndex(str(path))) == 0
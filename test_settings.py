@@ -0,0 +1,25 @@
+import pytest
+
+from settings import ConfigError, Settings
+
+
+def from_env(**values):
+    return Settings.from_env({"OPENAI_MODEL": "fake-model", **values})
+
+
+def test_poll_min_above_max_is_rejected():
+    with pytest.raises(ConfigError, match="POLL_MIN_SECONDS=90 is above POLL_MAX_SECONDS=60"):
+        from_env(POLL_MIN_SECONDS="90")
+    assert from_env(POLL_MIN_SECONDS="60").poll_min_seconds == 60.0
+
+
+def test_flags_accept_the_usual_off_values():
+    for value in ("0", "false", "No", "OFF"):
+        assert from_env(LOG_CONSOLE=value).log_console is False
+    for value in ("1", "true", "yes", "On"):
+        assert from_env(LOG_CONSOLE=value).log_console is True
+
+
+def test_unknown_flag_value_is_rejected():
+    with pytest.raises(ConfigError, match="LOG_CONSOLE"):
+        from_env(LOG_CONSOLE="maybe")
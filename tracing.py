@@ -0,0 +1,253 @@
+"""
+Per-post tracing for the monitor loop.
+
+Every post pulled from the listing gets a trace: a root "post" span that
+stays open from listing extraction to the final outcome, with child
+spans for dedup, the prefilter, classification, each OpenAI request and
+each WebDriver step. Spans carry the post id, token counts and outcome,
+so slow posts can be found individually instead of only as averages.
+
+Finished spans are appended to TRACE_FILE as JSON lines, one span per
+line, using OTLP field names (traceId, spanId, parentSpanId, name,
+startTimeUnixNano, endTimeUnixNano, attributes, status). Tracing is off
+until configure() points the tracer at TRACE_FILE (pipeline.run() does),
+and stays off when TRACE_FILE is empty; every call then returns a shared
+no-op span.
+
+Usage:
+    root = tracer.start_trace(post_id, "post", **{"post.id": post_id})
+    with root.child("prefilter") as span:
+        span.set_attribute("prefilter.reason", reason)
+    with tracer.span("openai.chat.completions"):   # child of the active span
+        ...
+    tracer.end_trace(post_id, **{"post.outcome": "messaged"})
+"""
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from settings import get_settings
+
+_active_span = contextvars.ContextVar("active_span", default=None)
+
+
+def _new_id(n_bytes):
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    """One timed operation in a trace; use as a context manager to make it the active span."""
+
+    def __init__(self, tracer, name, trace_id, parent=None, attributes=None, start_ns=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.root = parent.root if parent is not None else self
+        self.attributes = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.status = "OK"
+        self._tokens = []
+
+    def child(self, name, start_ns=None, **attributes):
+        """Start a child span now (or at start_ns)."""
+        return Span(self.tracer, name, self.trace_id, self, attributes, start_ns)
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key, amount):
+        """Increment a numeric attribute (e.g. a token total on the root span)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def record_exception(self, error):
+        self.status = "ERROR"
+        self.attributes["exception.type"] = type(error).__name__
+        self.attributes["exception.message"] = str(error)
+
+    def end(self, end_ns=None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        exporter = self.tracer.exporter
+        if exporter is None:  # tracer closed while the span was open
+            return
+        exporter.export(self)
+        if self.root is self:
+            exporter.flush()
+
+    def to_dict(self):
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+        }
+
+    def __enter__(self):
+        self._tokens.append(_active_span.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _active_span.reset(self._tokens.pop())
+        if exc is not None:
+            self.record_exception(exc)
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    """Stands in for a Span when tracing is off or there is no trace to attach to."""
+
+    name = trace_id = span_id = parent_id = None
+    attributes = {}
+
+    @property
+    def root(self):
+        return self
+
+    def child(self, name, start_ns=None, **attributes):
+        return self
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def add(self, key, amount):
+        pass
+
+    def record_exception(self, error):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonlExporter:
+    """Append finished spans to a JSON-lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    Creates spans and keeps the open root span of each in-flight post.
+
+    Args:
+        exporter (JsonlExporter, optional): Where finished spans go; None disables tracing.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+        self._traces = {}  # key (post id) -> open root span
+
+    @property
+    def enabled(self):
+        return self.exporter is not None
+
+    def start_trace(self, key, name, start_ns=None, **attributes):
+        """Open a root span for `key`, replacing any trace still open for it."""
+        if not self.enabled:
+            return NOOP_SPAN
+        root = Span(self, name, _new_id(16), attributes=attributes, start_ns=start_ns)
+        self._traces[key] = root
+        return root
+
+    def trace(self, key):
+        """The open root span for `key`, or a no-op span."""
+        return self._traces.get(key, NOOP_SPAN)
+
+    def end_trace(self, key, **attributes):
+        """Close the trace for `key`; safe to call more than once."""
+        root = self._traces.pop(key, None)
+        if root is not None:
+            root.set_attributes(**attributes)
+            root.end()
+
+    def current_span(self):
+        """The active span in this thread / asyncio task, or a no-op span."""
+        return _active_span.get() or NOOP_SPAN
+
+    @contextmanager
+    def activate(self, span):
+        """Make `span` the active span for the with-block without ending it."""
+        token = _active_span.set(span if isinstance(span, Span) else None)
+        try:
+            yield span
+        finally:
+            _active_span.reset(token)
+
+    def span(self, name, parent=None, **attributes):
+        """A child of `parent` (default: the active span); no-op outside a trace."""
+        parent = parent or _active_span.get()
+        if parent is None or not self.enabled:
+            return NOOP_SPAN
+        return parent.child(name, **attributes)
+
+    def record_span(self, name, parent, start_ns, end_ns, **attributes):
+        """Add an already-finished span, e.g. one shared request seen from several posts."""
+        if parent is NOOP_SPAN or parent is None or not self.enabled:
+            return NOOP_SPAN
+        span = parent.child(name, start_ns=start_ns, **attributes)
+        span.end(end_ns)
+        return span
+
+    def close(self):
+        for key in list(self._traces):
+            self.end_trace(key)
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+
+
+def configure(path=None):
+    """Point the module tracer at a JSONL file (default: TRACE_FILE; an empty path disables it)."""
+    tracer.close()
+    path = get_settings().trace_file if path is None else path
+    tracer.exporter = JsonlExporter(path) if path else None
+    return tracer
+
+
+tracer = Tracer(None)
+atexit.register(tracer.close)
@@ -0,0 +1,204 @@
+"""
+Record every classifier request and response for offline replay.
+
+Each OpenAI call made by classifier.py becomes one JSON line: stage,
+the listing refresh it belonged to, prompt version, model, a hash of the
+request, the posts it covered (with their listing index), the messages
+sent, the raw reply and its parsed form, latency, retries and
+token usage. Lines go to TRAFFIC_LOG, a gzip-compressed JSONL file that
+rotates by size (classifier_traffic.jsonl.gz, .1.jsonl.gz, ...).
+
+Recording never blocks the caller: entries go on a bounded queue and a
+background thread serializes, compresses and writes them. When the queue
+is full, entries are dropped and counted instead. The log is off when
+TRAFFIC_LOG is empty. The module recorder is built on the first
+get_recorder() call; assign `traffic_log.recorder` first to substitute
+another one.
+
+Replay the recorded traffic with `python -m benchmarks.replay_traffic`.
+"""
+import atexit
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import zlib
+
+from settings import get_settings
+
+log = logging.getLogger(__name__)
+
+SUFFIX = ".jsonl.gz"
+
+_STOP = object()
+
+
+def request_hash(model, messages):
+    """Stable hash of what the model was asked; equal requests hash equal."""
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def segment_path(path, index):
+    """classifier_traffic.jsonl.gz -> classifier_traffic.<index>.jsonl.gz (index 0 is the live file)."""
+    if index == 0:
+        return path
+    base = path[:-len(SUFFIX)] if path.endswith(SUFFIX) else path
+    return f"{base}.{index}{SUFFIX}"
+
+
+class TrafficRecorder:
+    """
+    Append entries to a rotating gzip JSONL file from a background thread.
+
+    Args:
+        path (str): The live log file; rotated segments are numbered next to it.
+        max_bytes (int): Rotate once this many uncompressed bytes were written (0 disables).
+        backup_count (int): Rotated segments to keep.
+        queue_size (int): Entries waiting to be written before new ones are dropped.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, backup_count=10, queue_size=10000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._size = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def record(self, entry):
+        """Queue one entry (a JSON-serializable dict) for writing."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Write everything queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join()
+        if self.dropped:
+            log.warning("Traffic log dropped %d entries (queue full)", self.dropped)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="traffic-log", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+            try:
+                self._write(entry)
+                # Flush once the burst is written, so a crash loses little
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception as e:
+                log.error("Could not write to traffic log %s: %s", self.path, e)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, entry):
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        if self._file is None:
+            # Appending adds a new gzip member; readers see one continuous stream
+            self._file = gzip.open(self.path, "ab")
+            self._size = 0
+        elif self.max_bytes and self._size + len(line) > self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        self._size += len(line)
+        self.written += 1
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = segment_path(self.path, index)
+                if os.path.exists(source):
+                    os.replace(source, segment_path(self.path, index + 1))
+            os.replace(self.path, segment_path(self.path, 1))
+        else:
+            os.remove(self.path)
+        self._file = gzip.open(self.path, "ab")
+        self._size = 0
+
+
+def segments(path=None):
+    """The log's files, oldest first (default: TRAFFIC_LOG)."""
+    path = get_settings().traffic_log if path is None else path
+    base = path[:-len(SUFFIX)] if path.endswith(SUFFIX) else path
+    rotated = []
+    for name in glob.glob(f"{glob.escape(base)}.*{SUFFIX}"):
+        index = name[len(base) + 1:-len(SUFFIX)]
+        if index.isdigit():
+            rotated.append((int(index), name))
+    files = [name for _, name in sorted(rotated, reverse=True)]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_traffic(path=None):
+    """
+    Yield recorded entries, oldest first, across rotated segments (default: TRAFFIC_LOG).
+
+    A segment cut off mid-write (the process was killed) is read up to the
+    last complete line.
+    """
+    for name in segments(path):
+        with gzip.open(name, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.endswith("\n"):
+                        yield json.loads(line)
+            except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+                log.warning("Traffic log %s ends early: %s", name, e)
+
+
+def configure(path=None):
+    """Point the module recorder at another file (default: TRAFFIC_LOG; an empty path disables it)."""
+    global recorder, _configured
+    if recorder is not None:
+        recorder.close()
+    settings = get_settings()
+    path = settings.traffic_log if path is None else path
+    recorder = TrafficRecorder(path, settings.traffic_log_max_bytes,
+                               settings.traffic_log_backup_count) if path else None
+    _configured = True
+    return recorder
+
+
+def get_recorder():
+    """The module recorder, configured from the settings on first use; None when the log is off."""
+    if recorder is None and not _configured:
+        configure()
+    return recorder
+
+
+def close():
+    if recorder is not None:
+        recorder.close()
+
+
+recorder = None
+_configured = False
+atexit.register(close)
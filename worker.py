@@ -0,0 +1,87 @@
+"""
+Heroku worker: the browser-free bot inside a fixed memory budget.
+
+Procfile:
+    worker: MALLOC_ARENA_MAX=2 python worker.py
+
+Runs the same pipeline as reddit_bot_api.py (the .json listing over HTTP,
+dedup, prefilter, batched classification), with defaults for a small dyno:
+
+- No Chrome and no Selenium import, so no desktop Chrome profile is needed.
+- Each lead (post, author, link and drafted message) is written to stdout
+  as one JSON line, since the dyno's disk is ephemeral; add a log drain
+  to keep them (the lead lines are the worker messages that start with
+  `{"post_id"`). Set LEADS_FILE to write them to a file instead.
+- Logs go to the console (stderr) only. Set LOG_FILE to also write the
+  JSON log.
+- RSS is checked before every cycle against MEMORY_BUDGET_MB (default
+  512, the size of a Standard-1X dyno). Past MEMORY_SOFT_LIMIT of it the
+  worker collects garbage and trims the heap; if it is still over the
+  budget it exits cleanly and the dyno manager restarts it.
+- SIGTERM (sent by Heroku on restarts and deploys) exits through the
+  normal shutdown path, so pending author-store writes are committed.
+- MALLOC_ARENA_MAX=2 stops glibc from giving each thread (httpx, the
+  logging listener, the asyncio pool) its own malloc arena.
+
+bot_state.sqlite3 and the seen-post index live on the dyno's filesystem,
+which is reset when the dyno restarts (at least daily). A worker that
+starts without bot_state.sqlite3 only handles posts submitted at most
+COLD_START_GRACE_SECONDS (default 300) before it started; older posts on
+the listing were handled by the previous dyno. Leads for posts from that
+window can be written again, so consumers should dedupe on post_id.
+
+Memory use over a simulated day: python -m benchmarks.bench_worker_memory
+"""
+import logging
+import os
+import signal
+import sys
+import time
+
+# Loads .env first, so a LOG_FILE or LEADS_FILE set there wins over the worker defaults below
+from settings import ConfigError, get_settings, openai_client
+
+os.environ.setdefault("LOG_FILE", "")
+os.environ.setdefault("LEADS_FILE", "-")
+
+from author_store import DB_FILE
+from bot_logging import setup_logging
+from listing_fetcher import ListingFetcher
+from memory_budget import MemoryBudget
+from sinks import LeadFileSink
+import pipeline
+
+log = logging.getLogger("worker")
+
+
+def run_worker():
+    budget = MemoryBudget.from_env()
+    # A fresh dyno has no record of what the previous one handled
+    not_before = None
+    if not os.path.exists(DB_FILE):
+        grace = get_settings().cold_start_grace_seconds
+        not_before = time.time() - grace
+        log.info("No saved state: skipping posts submitted more than %.0fs before start", grace)
+    fetcher = ListingFetcher(not_before=not_before)
+    sink = LeadFileSink()
+    log.info("Worker started: %.0f MB memory budget, leads to %s", budget.budget_mb,
+             "stdout" if sink.path == "-" else sink.path)
+    try:
+        pipeline.run(fetcher.fetch, "json", sink, health=budget, cursor=fetcher)
+    finally:
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        # Validate every setting, then fail at startup, not on the first post, if the API key is missing
+        get_settings()
+        setup_logging()
+        openai_client()
+        run_worker()
+    except ConfigError as e:
+        log.error("Configuration error: %s", e)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        log.info("Stopping worker...")